@@ -479,9 +479,12 @@ def _estimate_interval_timestamps(intervals: list[dict], streams: list[dict]) ->
 
 
 def enrich_activity(conn, activity_id: int, config: dict,
-                    verbose: bool = False) -> dict:
+                    verbose: bool = False, commit: bool = True) -> dict:
     """Run the full enrichment waterfall on an activity.
 
+    With commit=False the writes are left in the caller's transaction, so
+    bulk callers can commit many activities at once.
+
     Returns:
         Summary dict with enrichment results.
     """
@@ -903,7 +906,8 @@ def enrich_activity(conn, activity_id: int, config: dict,
              avg_pace, avg_pace_display, activity_id),
         )
 
-    conn.commit()
+    if commit:
+        conn.commit()
 
     if verbose:
         parts = []
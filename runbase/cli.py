@@ -130,10 +130,11 @@ def _print_import_summary(result: dict, dry_run: bool = False):
 
 def cmd_reconcile(args):
     from runbase.config import load_config
-    from runbase.db import get_connection
+    from runbase.db import get_connection, _migrate_schema
 
     config = load_config()
     conn = get_connection(config)
+    _migrate_schema(conn)
 
     # Step 1: Backfill dates if requested
     if args.backfill_dates:
@@ -145,7 +146,9 @@ def cmd_reconcile(args):
             pass
 
     # Step 2: Find activities without a linked Strava source
-    from runbase.reconcile.matcher import find_strava_match, find_strava_group_match
+    from runbase.reconcile.matcher import (
+        OrphanCache, find_strava_match, find_strava_group_match,
+    )
     from runbase.reconcile.enricher import enrich_from_strava, enrich_group_from_strava
 
     rows = conn.execute(
@@ -165,10 +168,11 @@ def cmd_reconcile(args):
     shoes_set = 0
     names_set = 0
     categories_set = 0
+    orphans = OrphanCache()
 
     for r in rows:
         activity_id, date, distance_mi = r
-        match = find_strava_match(conn, date, distance_mi)
+        match = find_strava_match(conn, date, distance_mi, orphans=orphans)
         if not match:
             continue
 
@@ -178,7 +182,8 @@ def cmd_reconcile(args):
                   f'← Strava "{strava_name}"')
 
         if not args.dry_run:
-            result = enrich_from_strava(conn, activity_id, match, verbose=args.verbose)
+            result = enrich_from_strava(conn, activity_id, match, verbose=args.verbose,
+                                        orphans=orphans)
             conn.commit()
             if result["shoe_set"]:
                 shoes_set += 1
@@ -212,7 +217,7 @@ def cmd_reconcile(args):
         if distance_mi is None or distance_mi <= 0:
             continue
 
-        group = find_strava_group_match(conn, date, distance_mi)
+        group = find_strava_group_match(conn, date, distance_mi, orphans=orphans)
         if not group:
             continue
 
@@ -225,7 +230,8 @@ def cmd_reconcile(args):
                   f"{', '.join(group_names)}")
 
         if not args.dry_run:
-            result = enrich_group_from_strava(conn, activity_id, group, verbose=args.verbose)
+            result = enrich_group_from_strava(conn, activity_id, group, verbose=args.verbose,
+                                              orphans=orphans)
             conn.commit()
             if result["shoe_set"]:
                 shoes_set += 1
@@ -559,7 +565,7 @@ def cmd_pipeline(args):
     # Step 2b: Lightweight reconcile — link orphaned Strava sources to activities
     if verbose:
         print("\n=== Reconcile ===")
-    from runbase.reconcile.matcher import find_strava_match
+    from runbase.reconcile.matcher import OrphanCache, find_strava_match
     from runbase.reconcile.enricher import enrich_from_strava
 
     conn = get_connection(config)
@@ -575,12 +581,14 @@ def cmd_pipeline(args):
     ).fetchall()
 
     reconciled_ids = []
+    orphans = OrphanCache()
     for r in rows:
         activity_id, date, distance_mi = r
-        match = find_strava_match(conn, date, distance_mi)
+        match = find_strava_match(conn, date, distance_mi, orphans=orphans)
         if not match:
             continue
-        result = enrich_from_strava(conn, activity_id, match, verbose=verbose)
+        result = enrich_from_strava(conn, activity_id, match, verbose=verbose,
+                                    orphans=orphans)
         conn.commit()
         reconciled_ids.append(activity_id)
         if verbose:
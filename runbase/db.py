@@ -52,7 +52,8 @@ CREATE TABLE IF NOT EXISTS activity_sources (
     workout_name        TEXT,
     notes               TEXT,
     metadata_json       TEXT,
-    imported_at         TEXT DEFAULT (datetime('now'))
+    imported_at         TEXT DEFAULT (datetime('now')),
+    start_date          TEXT GENERATED ALWAYS AS (CASE WHEN json_valid(metadata_json) THEN json_extract(metadata_json, '$.start_date') END) VIRTUAL
 );
 
 -- Interval/rep-level data
@@ -196,8 +197,13 @@ CREATE TABLE IF NOT EXISTS planned_activities (
     created_at      TEXT DEFAULT (datetime('now'))
 );
 
+-- Strava gear ids whose lookup failed (suppresses re-fetching for a day)
+CREATE TABLE IF NOT EXISTS strava_unknown_gear (
+    gear_id         TEXT PRIMARY KEY,
+    tried_at        TEXT NOT NULL
+);
+
 -- Indexes
-CREATE INDEX IF NOT EXISTS idx_activities_date ON activities(date);
 CREATE INDEX IF NOT EXISTS idx_activity_sources_activity ON activity_sources(activity_id);
 CREATE INDEX IF NOT EXISTS idx_activity_sources_source ON activity_sources(source);
 CREATE INDEX IF NOT EXISTS idx_intervals_activity ON intervals(activity_id);
@@ -207,8 +213,90 @@ CREATE INDEX IF NOT EXISTS idx_processed_files_hash ON processed_files(file_hash
 CREATE INDEX IF NOT EXISTS idx_vdot_history_date ON vdot_history(effective_date);
 """
 
+# Per-day distance rollup behind the review UI's 7-day trailing mileage.
+# Triggers refresh a day's row whenever an activity or planned entry on that
+# date changes, so reads scan days instead of activities.
+_DAILY_ACTIVITY_REFRESH = """
+            INSERT INTO daily_distance (date, real_mi, activity_count)
+                SELECT {d}, total(COALESCE(adjusted_distance_mi, distance_mi, 0)), count(*)
+                FROM activities WHERE date = {d}
+                ON CONFLICT(date) DO UPDATE SET
+                    real_mi = excluded.real_mi,
+                    activity_count = excluded.activity_count;"""
+_DAILY_PLANNED_SET = """
+            INSERT INTO daily_distance (date, planned_mi) VALUES ({d}, {mi})
+                ON CONFLICT(date) DO UPDATE SET planned_mi = excluded.planned_mi;"""
+
+DAILY_DISTANCE_SQL = f"""
+        CREATE TABLE IF NOT EXISTS daily_distance (
+            date            TEXT PRIMARY KEY,
+            real_mi         REAL NOT NULL DEFAULT 0,
+            activity_count  INTEGER NOT NULL DEFAULT 0,
+            planned_mi      REAL
+        );
+        CREATE TRIGGER IF NOT EXISTS trg_daily_distance_activity_insert
+        AFTER INSERT ON activities BEGIN{_DAILY_ACTIVITY_REFRESH.format(d="NEW.date")}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_daily_distance_activity_delete
+        AFTER DELETE ON activities BEGIN{_DAILY_ACTIVITY_REFRESH.format(d="OLD.date")}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_daily_distance_activity_update
+        AFTER UPDATE OF date, distance_mi, adjusted_distance_mi ON activities BEGIN{_DAILY_ACTIVITY_REFRESH.format(d="OLD.date")}{_DAILY_ACTIVITY_REFRESH.format(d="NEW.date")}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_daily_distance_planned_insert
+        AFTER INSERT ON planned_activities BEGIN{_DAILY_PLANNED_SET.format(d="NEW.date", mi="NEW.distance_mi")}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_daily_distance_planned_delete
+        AFTER DELETE ON planned_activities BEGIN{_DAILY_PLANNED_SET.format(d="OLD.date", mi="NULL")}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_daily_distance_planned_update
+        AFTER UPDATE ON planned_activities BEGIN{_DAILY_PLANNED_SET.format(d="OLD.date", mi="NULL")}{_DAILY_PLANNED_SET.format(d="NEW.date", mi="NEW.distance_mi")}
+        END;
+"""
+
+# Per-month totals behind the review UI's footer stats, refreshed by
+# trigger from the month's activities the same way as daily_distance.
+_MONTHLY_REFRESH = """
+            INSERT INTO monthly_stats (year, month, distance, duration, count, longest)
+                SELECT CAST(substr({d}, 1, 4) AS INTEGER), CAST(substr({d}, 6, 2) AS INTEGER),
+                       total(COALESCE(adjusted_distance_mi, distance_mi, 0)),
+                       total(COALESCE(duration_s, 0)),
+                       count(*),
+                       COALESCE(max(COALESCE(adjusted_distance_mi, distance_mi, 0)), 0.0)
+                FROM activities
+                WHERE date BETWEEN substr({d}, 1, 7) || '-01' AND substr({d}, 1, 7) || '-31'
+                ON CONFLICT(year, month) DO UPDATE SET
+                    distance = excluded.distance,
+                    duration = excluded.duration,
+                    count = excluded.count,
+                    longest = excluded.longest;"""
+
+MONTHLY_STATS_SQL = f"""
+        CREATE TABLE IF NOT EXISTS monthly_stats (
+            year        INTEGER NOT NULL,
+            month       INTEGER NOT NULL,
+            distance    REAL NOT NULL DEFAULT 0,
+            duration    REAL NOT NULL DEFAULT 0,
+            count       INTEGER NOT NULL DEFAULT 0,
+            longest     REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (year, month)
+        );
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_stats_activity_insert
+        AFTER INSERT ON activities BEGIN{_MONTHLY_REFRESH.format(d="NEW.date")}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_stats_activity_delete
+        AFTER DELETE ON activities BEGIN{_MONTHLY_REFRESH.format(d="OLD.date")}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_stats_activity_update
+        AFTER UPDATE OF date, distance_mi, adjusted_distance_mi, duration_s ON activities BEGIN{_MONTHLY_REFRESH.format(d="OLD.date")}{_MONTHLY_REFRESH.format(d="NEW.date")}
+        END;
+"""
+
 DEFAULT_DB_PATH = Path.home() / "runbase" / "data" / "runbase.db"
 
+# Prepared statements kept per connection (sqlite3's default is 128)
+STATEMENT_CACHE_SIZE = 256
+
 
 def get_db_path(config=None):
     """Resolve the database path from config or fall back to default."""
@@ -217,16 +305,32 @@ def get_db_path(config=None):
     return DEFAULT_DB_PATH
 
 
-def get_connection(config=None):
-    """Return a sqlite3 connection using the configured db path."""
+def get_connection(config=None, **connect_kwargs):
+    """Return a sqlite3 connection using the configured db path.
+
+    Extra keyword arguments (factory, check_same_thread, ...) are passed
+    through to sqlite3.connect().
+    """
     db_path = get_db_path(config)
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path), cached_statements=STATEMENT_CACHE_SIZE,
+                           **connect_kwargs)
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
     return conn
 
 
+def get_read_connection(config=None):
+    """Return a read-only sqlite3 connection to the configured db.
+
+    Under WAL, readers don't block behind the writer connection, so bulk
+    lookups can run on this while writes go through get_connection().
+    """
+    db_path = get_db_path(config).resolve()
+    return sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+
+
 def _migrate_schema(conn):
     """Add columns that may be missing from existing databases."""
     migrations = [
@@ -248,12 +352,16 @@ def _migrate_schema(conn):
         ("activities", "vdot", "REAL"),
         # Stream source tracking
         ("streams", "source_id", "INTEGER REFERENCES activity_sources(id)"),
+        # Indexed Strava start date for orphan matching
+        ("activity_sources", "start_date",
+         "TEXT GENERATED ALWAYS AS (CASE WHEN json_valid(metadata_json) THEN json_extract(metadata_json, '$.start_date') END) VIRTUAL"),
     ]
 
     existing = {}
     for table, col, col_type in migrations:
         if table not in existing:
-            rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
+            # table_xinfo also lists generated columns
+            rows = conn.execute(f"PRAGMA table_xinfo({table})").fetchall()
             existing[table] = {r[1] for r in rows}
         if col not in existing[table]:
             conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}")
@@ -264,11 +372,13 @@ def _migrate_schema(conn):
     ]
     for table, old_col, new_col in renames:
         if table not in existing:
-            rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
+            rows = conn.execute(f"PRAGMA table_xinfo({table})").fetchall()
             existing[table] = {r[1] for r in rows}
         if old_col in existing[table] and new_col not in existing[table]:
             conn.execute(f"ALTER TABLE {table} RENAME COLUMN {old_col} TO {new_col}")
 
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
     # New tables for existing databases
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS detected_tracks (
@@ -295,7 +405,46 @@ def _migrate_schema(conn):
             workout_name    TEXT,
             created_at      TEXT DEFAULT (datetime('now'))
         );
+        CREATE TABLE IF NOT EXISTS strava_unknown_gear (
+            gear_id         TEXT PRIMARY KEY,
+            tried_at        TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_activity_sources_orphan_date
+            ON activity_sources(source, activity_id, start_date);
+        CREATE INDEX IF NOT EXISTS idx_streams_activity_gps
+            ON streams(activity_id) WHERE lat IS NOT NULL;
+        CREATE INDEX IF NOT EXISTS idx_intervals_activity_zone
+            ON intervals(activity_id, pace_zone, is_recovery, is_walking, source)
+            WHERE source IS NULL OR source != 'pace_segment';
+        CREATE INDEX IF NOT EXISTS idx_activities_date_distance
+            ON activities(date, adjusted_distance_mi, distance_mi, duration_s);
+        -- idx_activities_date_distance also serves every date-only lookup
+        DROP INDEX IF EXISTS idx_activities_date;
     """)
+    conn.executescript(DAILY_DISTANCE_SQL)
+    conn.executescript(MONTHLY_STATS_SQL)
+    if "daily_distance" not in tables:
+        # Backfill the rollup; the triggers keep it current from here on
+        conn.execute(
+            """INSERT INTO daily_distance (date, real_mi, activity_count)
+               SELECT date, total(COALESCE(adjusted_distance_mi, distance_mi, 0)), count(*)
+               FROM activities GROUP BY date"""
+        )
+        conn.execute(
+            """INSERT INTO daily_distance (date, planned_mi)
+               SELECT date, distance_mi FROM planned_activities WHERE true
+               ON CONFLICT(date) DO UPDATE SET planned_mi = excluded.planned_mi"""
+        )
+    if "monthly_stats" not in tables:
+        conn.execute(
+            """INSERT INTO monthly_stats (year, month, distance, duration, count, longest)
+               SELECT CAST(substr(date, 1, 4) AS INTEGER), CAST(substr(date, 6, 2) AS INTEGER),
+                      total(COALESCE(adjusted_distance_mi, distance_mi, 0)),
+                      total(COALESCE(duration_s, 0)),
+                      count(*),
+                      max(COALESCE(adjusted_distance_mi, distance_mi, 0))
+               FROM activities GROUP BY substr(date, 1, 7)"""
+        )
 
     conn.commit()
 
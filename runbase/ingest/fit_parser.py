@@ -2,6 +2,7 @@
 
 import hashlib
 import re
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -151,6 +152,26 @@ def _avg_from_streams(streams: list[Stream], field: str) -> float | None:
     return sum(values) / len(values)
 
 
+def _avg_of(values) -> float | None:
+    """Average of a column slice, ignoring None values."""
+    present = [v for v in values if v is not None]
+    if not present:
+        return None
+    return sum(present) / len(present)
+
+
+def _stream_columns(streams: list[Stream]) -> tuple[list, list, list]:
+    """Timestamp, HR and cadence columns for timestamped records, in time order."""
+    rows = sorted(
+        ((s.timestamp_s, s.heart_rate, s.cadence) for s in streams if s.timestamp_s is not None),
+        key=lambda row: row[0],
+    )
+    if not rows:
+        return [], [], []
+    timestamps, heart_rates, cadences = map(list, zip(*rows))
+    return timestamps, heart_rates, cadences
+
+
 def _apply_stream_averages(activity: Activity, streams: list[Stream]) -> None:
     """Recompute avg HR, cadence, and pace from per-second stream data."""
     avg_hr = _avg_from_streams(streams, "heart_rate")
@@ -228,6 +249,7 @@ def _extract_laps(messages, streams: list[Stream]) -> list[Interval]:
     lap's start_time/timestamp to slice the relevant stream records.
     """
     laps = []
+    timestamps, heart_rates, cadences = _stream_columns(streams)
     for i, msg in enumerate(messages):
         if msg.name != "lap":
             continue
@@ -256,12 +278,10 @@ def _extract_laps(messages, streams: list[Stream]) -> list[Interval]:
         avg_hr = None
         avg_cadence = None
         if lap_start_ts is not None and lap_end_ts is not None:
-            lap_streams = [
-                s for s in streams
-                if s.timestamp_s is not None and lap_start_ts <= s.timestamp_s <= lap_end_ts
-            ]
-            avg_hr = _avg_from_streams(lap_streams, "heart_rate")
-            avg_cadence = _avg_from_streams(lap_streams, "cadence")
+            lo = bisect_left(timestamps, lap_start_ts)
+            hi = bisect_right(timestamps, lap_end_ts)
+            avg_hr = _avg_of(heart_rates[lo:hi])
+            avg_cadence = _avg_of(cadences[lo:hi])
 
         if avg_hr is not None:
             avg_hr = round(avg_hr, 2)
@@ -326,8 +346,5 @@ def _extract_workout_name(file_path: str) -> str | None:
 
 def _compute_file_hash(file_path: str) -> str:
     """Compute SHA-256 hash of a file."""
-    sha256 = hashlib.sha256()
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            sha256.update(chunk)
-    return sha256.hexdigest()
+        return hashlib.file_digest(f, "sha256").hexdigest()
@@ -5,16 +5,17 @@ import shutil
 from datetime import datetime, timezone
 from pathlib import Path
 
-from runbase.db import get_connection
+from runbase.db import get_connection, _migrate_schema
 from runbase.ingest.fit_parser import parse_fit_file
 
 
 def _enrich_new_activities(conn, activity_ids: list[int], verbose: bool) -> int:
     """Try to match new FIT activities against orphaned Strava sources."""
-    from runbase.reconcile.matcher import find_strava_match
+    from runbase.reconcile.matcher import OrphanCache, find_strava_match
     from runbase.reconcile.enricher import enrich_from_strava
 
     enriched = 0
+    orphans = OrphanCache()
     for activity_id in activity_ids:
         row = conn.execute(
             "SELECT date, distance_mi FROM activities WHERE id = ?",
@@ -24,11 +25,11 @@ def _enrich_new_activities(conn, activity_ids: list[int], verbose: bool) -> int:
             continue
 
         date, distance_mi = row
-        match = find_strava_match(conn, date, distance_mi)
+        match = find_strava_match(conn, date, distance_mi, orphans=orphans)
         if match:
             if verbose:
                 print(f"  ENRICH activity #{activity_id} ← Strava \"{match.get('strava_name', '')}\"")
-            enrich_from_strava(conn, activity_id, match, verbose=verbose)
+            enrich_from_strava(conn, activity_id, match, verbose=verbose, orphans=orphans)
             conn.commit()
             enriched += 1
 
@@ -71,6 +72,7 @@ def sync_icloud(config: dict, dry_run: bool = False, verbose: bool = False) -> d
         print(f"Found {len(fit_files)} .fit file(s) in {icloud_path}")
 
     conn = get_connection(config)
+    _migrate_schema(conn)
     result = {"new": 0, "skipped": 0, "errors": 0, "enriched": 0, "details": []}
 
     new_activity_ids = []
@@ -6,20 +6,26 @@ with activity_id=NULL for later review.
 """
 
 import json
+import sqlite3
 import time as time_mod
+from bisect import bisect_left
+from contextlib import closing
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from stravalib import Client
 
-from runbase.db import get_connection
+from runbase.db import get_connection, get_read_connection, _migrate_schema
 from runbase.ingest.fit_parser import format_pace
 
 METERS_PER_MILE = 1609.344
 METERS_TO_FEET = 3.28084
 
+# Don't retry a failed gear lookup until this long after the last attempt
+UNKNOWN_GEAR_RETRY = timedelta(hours=24)
+
 # Strava activity types we care about
-RUNNING_TYPES = {"Run", "TrailRun", "VirtualRun"}
+RUNNING_TYPES = frozenset({"Run", "TrailRun", "VirtualRun"})
 
 
 # ---------------------------------------------------------------------------
@@ -42,6 +48,7 @@ class StravaRateLimiter:
     def __init__(self):
         self.short_usage = 0
         self.daily_usage = 0
+        self.observed_at = None  # when usage was last read from a response
         self.pause_count = 0
         self.aborted = False
 
@@ -53,6 +60,35 @@ class StravaRateLimiter:
             if len(parts) >= 2:
                 self.short_usage = int(parts[0].strip())
                 self.daily_usage = int(parts[1].strip())
+                self.observed_at = datetime.now(timezone.utc)
+
+    def to_state(self) -> dict | None:
+        """Serialize usage for the next run, or None if nothing was observed."""
+        if self.observed_at is None:
+            return None
+        return {
+            "short_usage": self.short_usage,
+            "daily_usage": self.daily_usage,
+            "observed_at": self.observed_at.isoformat(),
+        }
+
+    def restore(self, state: dict):
+        """Carry over usage from a previous run if its windows are still open.
+
+        Strava's short window resets on the quarter hour and the daily window
+        at midnight UTC, so stale counts are dropped rather than trusted.
+        """
+        try:
+            observed = datetime.fromisoformat(state["observed_at"])
+        except (KeyError, TypeError, ValueError):
+            return
+        now = datetime.now(timezone.utc)
+        if observed.date() != now.date():
+            return
+        self.daily_usage = int(state.get("daily_usage") or 0)
+        self.observed_at = observed
+        if (observed.hour, observed.minute // 15) == (now.hour, now.minute // 15):
+            self.short_usage = int(state.get("short_usage") or 0)
 
     def check(self, verbose=False):
         """Check limits and sleep/abort if needed. Returns False if daily limit hit."""
@@ -84,6 +120,33 @@ class StravaRateLimiter:
         return True
 
 
+def _load_rate_limiter(conn) -> StravaRateLimiter:
+    """Create a rate limiter seeded with usage persisted by a previous run."""
+    rate_limiter = StravaRateLimiter()
+    row = conn.execute(
+        "SELECT metadata_json FROM sync_state WHERE source = 'strava_rate_limit'"
+    ).fetchone()
+    if row and row[0]:
+        rate_limiter.restore(json.loads(row[0]))
+    return rate_limiter
+
+
+def _save_rate_limiter(conn, rate_limiter: StravaRateLimiter):
+    """Persist rate limit usage so the next run starts from the real quota."""
+    state = rate_limiter.to_state()
+    if state is None:
+        return
+    conn.execute(
+        """INSERT INTO sync_state (source, last_sync_at, metadata_json)
+           VALUES ('strava_rate_limit', ?, ?)
+           ON CONFLICT(source)
+           DO UPDATE SET last_sync_at=excluded.last_sync_at,
+                         metadata_json=excluded.metadata_json""",
+        (state["observed_at"], json.dumps(state)),
+    )
+    conn.commit()
+
+
 # ---------------------------------------------------------------------------
 # Token management
 # ---------------------------------------------------------------------------
@@ -153,7 +216,7 @@ def _build_activity_lookup(conn) -> dict:
 
     lookup = {}
     for r in rows:
-        date = r[0 + 1]  # date is column index 1
+        date = r[1]
         entry = {
             "id": r[0],
             "date": r[1],
@@ -170,21 +233,44 @@ def _build_activity_lookup(conn) -> dict:
         }
         lookup.setdefault(date, []).append(entry)
 
+    # Sort each day by distance so matching can bisect to the tolerance window
+    for entries in lookup.values():
+        entries.sort(key=_distance_key)
+
     return lookup
 
 
+def _distance_key(entry: dict) -> float:
+    """Sort key for lookup entries; missing/non-positive distances sort first as 0."""
+    dist = entry["distance_mi"]
+    return dist if dist and dist > 0 else 0.0
+
+
+def _load_shoe_cache(conn) -> dict:
+    """Seed the gear_id -> shoes.id cache from the DB.
+
+    Known shoes map to their id; gear ids whose Strava lookup failed within
+    UNKNOWN_GEAR_RETRY map to None so _ensure_shoe skips the API call.
+    """
+    cache = {
+        gear_id: shoe_id for gear_id, shoe_id in conn.execute(
+            "SELECT strava_gear_id, id FROM shoes WHERE strava_gear_id IS NOT NULL")
+    }
+    retry_after = (datetime.now(timezone.utc) - UNKNOWN_GEAR_RETRY).isoformat()
+    for (gear_id,) in conn.execute(
+            "SELECT gear_id FROM strava_unknown_gear WHERE tried_at > ?", (retry_after,)):
+        cache.setdefault(gear_id, None)
+    return cache
+
+
 def _load_processed_strava_ids(conn) -> set:
     """Load already-processed Strava IDs from processed_files table."""
-    rows = conn.execute(
-        "SELECT file_path FROM processed_files WHERE source = 'strava'"
-    ).fetchall()
-    ids = set()
-    for r in rows:
-        # file_path format: "strava:{strava_id}"
-        path = r[0]
-        if path.startswith("strava:"):
-            ids.add(path[7:])
-    return ids
+    # file_path format: "strava:{strava_id}" — strip the prefix in SQL
+    return {
+        r[0] for r in conn.execute(
+            """SELECT substr(file_path, 8) FROM processed_files
+               WHERE source = 'strava' AND substr(file_path, 1, 7) = 'strava:'""")
+    }
 
 
 def _get_last_sync_timestamp(conn) -> datetime | None:
@@ -223,41 +309,53 @@ def _activity_has_streams(conn, activity_id: int) -> bool:
 def _match_strava_activity(strava_act, lookup: dict, tolerance_pct: float) -> dict | None:
     """Match a Strava activity to a DB activity by date + distance.
 
-    Returns the matched DB activity dict or None.
+    Lookup lists are sorted by distance (see _build_activity_lookup), so only
+    the slice within tolerance is scored. Returns the matched DB activity dict
+    or None.
     """
-    strava_date = strava_act.start_date_local.strftime("%Y-%m-%d")
+    dt = strava_act.start_date_local
+    strava_date = dt.strftime("%Y-%m-%d")
     strava_dist_mi = float(strava_act.distance) / METERS_PER_MILE if strava_act.distance else 0
 
     # Check date and ±1 day as timezone fallback
-    candidate_dates = [strava_date]
-    dt = strava_act.start_date_local
-    candidate_dates.append((dt - timedelta(days=1)).strftime("%Y-%m-%d"))
-    candidate_dates.append((dt + timedelta(days=1)).strftime("%Y-%m-%d"))
-
-    candidates = []
-    for d in candidate_dates:
-        candidates.extend(lookup.get(d, []))
-
-    if not candidates:
-        return None
+    candidate_dates = (
+        strava_date,
+        (dt - timedelta(days=1)).strftime("%Y-%m-%d"),
+        (dt + timedelta(days=1)).strftime("%Y-%m-%d"),
+    )
 
-    # Score candidates by distance similarity
     best_match = None
     best_diff_pct = float("inf")
 
-    for cand in candidates:
-        db_dist = cand["distance_mi"]
-        if db_dist is None or db_dist <= 0:
-            # No distance on DB side — match by date only (lower confidence)
-            if cand["date"] == strava_date and best_match is None:
-                best_match = cand
-                best_diff_pct = 100  # low-confidence sentinel
-            continue
+    # No distance on DB side — match by date only (lower confidence).
+    # Those entries sort first, so only the head of the same-day list matters.
+    same_day = lookup.get(strava_date)
+    if same_day and _distance_key(same_day[0]) == 0:
+        best_match = same_day[0]
+        best_diff_pct = 100  # low-confidence sentinel
+
+    if strava_dist_mi <= 0:
+        return best_match
 
-        diff_pct = abs(strava_dist_mi - db_dist) / db_dist * 100
-        if diff_pct <= tolerance_pct and diff_pct < best_diff_pct:
-            best_match = cand
-            best_diff_pct = diff_pct
+    # diff_pct <= tol  <=>  dist / (1 + tol) <= db_dist <= dist / (1 - tol);
+    # widen slightly so float rounding never drops a boundary candidate
+    tol = tolerance_pct / 100
+    lo = strava_dist_mi / (1 + tol) * (1 - 1e-9)
+    hi = strava_dist_mi / (1 - tol) * (1 + 1e-9) if tol < 1 else float("inf")
+
+    for d in candidate_dates:
+        entries = lookup.get(d)
+        if not entries:
+            continue
+        for i in range(bisect_left(entries, lo, key=_distance_key), len(entries)):
+            cand = entries[i]
+            db_dist = cand["distance_mi"]
+            if db_dist > hi:
+                break
+            diff_pct = abs(strava_dist_mi - db_dist) / db_dist * 100
+            if diff_pct <= tolerance_pct and diff_pct < best_diff_pct:
+                best_match = cand
+                best_diff_pct = diff_pct
 
     return best_match
 
@@ -266,6 +364,15 @@ def _match_strava_activity(strava_act, lookup: dict, tolerance_pct: float) -> di
 # Data extraction and conversion
 # ---------------------------------------------------------------------------
 
+def _activity_type(strava_act) -> str:
+    """Return the activity type string (newer stravalib wraps it in a RootModel)."""
+    act_type = strava_act.type
+    root = getattr(act_type, "root", None)
+    if root is not None:
+        return root
+    return str(act_type)
+
+
 def _extract_strava_data(strava_act) -> dict:
     """Extract and convert fields from a stravalib activity object."""
     distance_mi = float(strava_act.distance) / METERS_PER_MILE if strava_act.distance else None
@@ -310,7 +417,7 @@ def _extract_strava_data(strava_act) -> dict:
     return {
         "strava_id": str(strava_act.id),
         "name": strava_act.name,
-        "type": strava_act.type.root if hasattr(strava_act.type, 'root') else str(strava_act.type),
+        "type": _activity_type(strava_act),
         "date": strava_act.start_date_local.strftime("%Y-%m-%d"),
         "start_time": start_time,
         "distance_mi": round(distance_mi, 3) if distance_mi else None,
@@ -360,8 +467,13 @@ def _is_generic_name(name: str | None) -> bool:
     return False
 
 
-def _merge_fields(conn, activity_id: int, strava_data: dict, verbose: bool) -> list:
-    """Fill NULL fields on canonical activity with Strava data. Returns list of filled fields."""
+def _merge_fields(conn, activity_id: int, strava_data: dict, verbose: bool) -> dict:
+    """Collect NULL fields on canonical activity that Strava data can fill.
+
+    Returns a {column: value} dict of pending updates; nothing is written here
+    so the caller can fold further columns (e.g. shoe_id) into one UPDATE via
+    _apply_activity_updates().
+    """
     # Map strava_data keys to DB column names (most are the same)
     field_map = {
         "start_time": "start_time",
@@ -373,44 +485,47 @@ def _merge_fields(conn, activity_id: int, strava_data: dict, verbose: bool) -> l
         "avg_cadence": "avg_cadence",
     }
 
+    cols = list(field_map.values()) + ["workout_name"]
+    row = conn.execute(
+        f"SELECT {', '.join(cols)} FROM activities WHERE id = ?", (activity_id,)
+    ).fetchone()
+    if not row:
+        return {}
+    current = dict(zip(cols, row))
+
     # total_descent_ft: Strava doesn't provide descent separately in summary,
     # but we include it in the fillable list for future use
-    filled = []
+    updates = {}
     for strava_key, db_col in field_map.items():
         strava_val = strava_data.get(strava_key)
         if strava_val is None:
             continue
-
-        # Check if DB field is NULL
-        row = conn.execute(
-            f"SELECT {db_col} FROM activities WHERE id = ?", (activity_id,)
-        ).fetchone()
-        if row and row[0] is None:
-            conn.execute(
-                f"UPDATE activities SET {db_col} = ?, updated_at = datetime('now') WHERE id = ?",
-                (strava_val, activity_id),
-            )
-            filled.append(db_col)
+        if current[db_col] is None:
+            updates[db_col] = strava_val
             if verbose:
                 print(f"    FILL {db_col} = {strava_val}")
 
     # Replace generic workout names with real Strava names
     strava_name = strava_data.get("name")
     if strava_name and not _is_generic_name(strava_name):
-        row = conn.execute(
-            "SELECT workout_name FROM activities WHERE id = ?", (activity_id,)
-        ).fetchone()
-        current_name = row[0] if row else None
+        current_name = current["workout_name"]
         if _is_generic_name(current_name):
-            conn.execute(
-                "UPDATE activities SET workout_name = ?, updated_at = datetime('now') WHERE id = ?",
-                (strava_name, activity_id),
-            )
-            filled.append("workout_name")
+            updates["workout_name"] = strava_name
             if verbose:
                 print(f"    NAME '{current_name}' → '{strava_name}'")
 
-    return filled
+    return updates
+
+
+def _apply_activity_updates(conn, activity_id: int, updates: dict):
+    """Write pending column updates to an activity in a single UPDATE."""
+    if not updates:
+        return
+    assignments = ", ".join(f"{col} = ?" for col in updates)
+    conn.execute(
+        f"UPDATE activities SET {assignments}, updated_at = datetime('now') WHERE id = ?",
+        (*updates.values(), activity_id),
+    )
 
 
 def _insert_activity_source(conn, activity_id: int | None, strava_data: dict,
@@ -428,20 +543,21 @@ def _insert_activity_source(conn, activity_id: int | None, strava_data: dict,
     if strava_data.get("elapsed_s"):
         metadata["elapsed_s"] = strava_data["elapsed_s"]
 
-    cursor = conn.execute(
+    row = conn.execute(
         """INSERT INTO activity_sources
            (activity_id, source, source_id, distance_mi, duration_s,
             avg_pace_s_per_mi, avg_hr, max_hr, avg_cadence,
             total_ascent_ft, calories, workout_name, metadata_json)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+           RETURNING id""",
         (activity_id, "strava", strava_data["strava_id"],
          strava_data["distance_mi"], strava_data["duration_s"],
          strava_data["avg_pace_s_per_mi"], strava_data["avg_hr"],
          strava_data["max_hr"], strava_data["avg_cadence"],
          strava_data["total_ascent_ft"], strava_data["calories"],
          strava_data["name"], json.dumps(metadata)),
-    )
-    return cursor.lastrowid
+    ).fetchone()
+    return row[0]
 
 
 def _fetch_and_insert_laps(client, conn, strava_id: str, activity_id: int,
@@ -604,6 +720,11 @@ def _ensure_shoe(conn, client, gear_id: str, shoe_cache: dict,
         if verbose:
             print(f"    WARN gear fetch failed for {gear_id}: {e}")
         shoe_cache[gear_id] = None
+        conn.execute(
+            """INSERT INTO strava_unknown_gear (gear_id, tried_at) VALUES (?, ?)
+               ON CONFLICT(gear_id) DO UPDATE SET tried_at=excluded.tried_at""",
+            (gear_id, datetime.now(timezone.utc).isoformat()),
+        )
         return None
 
     if not rate_limiter.check(verbose):
@@ -628,6 +749,14 @@ def _ensure_shoe(conn, client, gear_id: str, shoe_cache: dict,
     return shoe_id
 
 
+def _iter_running_activities(client, after, rate_limiter: StravaRateLimiter):
+    """Yield running activities from the Strava activity list, page by page."""
+    for act in client.get_activities(after=after):
+        _update_rate_limiter(client, rate_limiter)
+        if _activity_type(act) in RUNNING_TYPES:
+            yield act
+
+
 # ---------------------------------------------------------------------------
 # Main entry point
 # ---------------------------------------------------------------------------
@@ -644,7 +773,7 @@ def backfill_strava_laps(config: dict, verbose: bool = False) -> dict:
     """
     conn = get_connection(config)
     client = _get_client(config)
-    rate_limiter = StravaRateLimiter()
+    rate_limiter = _load_rate_limiter(conn)
 
     # Find activities with a Strava source + existing intervals but no strava_lap
     rows = conn.execute("""
@@ -732,6 +861,7 @@ def backfill_strava_laps(config: dict, verbose: bool = False) -> dict:
                 pass
 
     result["rate_limit_pauses"] = rate_limiter.pause_count
+    _save_rate_limiter(conn, rate_limiter)
     conn.close()
     return result
 
@@ -752,7 +882,7 @@ def backfill_orphan_streams(config: dict, conn, pairs: list[tuple],
         return {"streams_inserted": 0, "laps_inserted": 0, "errors": 0, "rate_limit_pauses": 0}
 
     client = _get_client(config)
-    rate_limiter = StravaRateLimiter()
+    rate_limiter = _load_rate_limiter(conn)
 
     result = {"streams_inserted": 0, "laps_inserted": 0, "errors": 0, "rate_limit_pauses": 0}
 
@@ -796,6 +926,7 @@ def backfill_orphan_streams(config: dict, conn, pairs: list[tuple],
                 pass
 
     result["rate_limit_pauses"] = rate_limiter.pause_count
+    _save_rate_limiter(conn, rate_limiter)
     return result
 
 
@@ -808,49 +939,59 @@ def sync_strava(config: dict, dry_run: bool = False, verbose: bool = False,
     rate_limit_pauses, details.
     """
     client = _get_client(config)
-    conn = get_connection(config)
-    rate_limiter = StravaRateLimiter()
+    with closing(get_connection(config)) as conn:
+        try:
+            return _sync_strava(client, conn, config, dry_run, verbose,
+                                full_history, fetch_streams)
+        finally:
+            # Fold the WAL back into the db even if the sync was interrupted
+            try:
+                conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            except sqlite3.Error:
+                pass
 
-    tolerance_pct = config.get("reconcile", {}).get("distance_tolerance_pct", 5)
 
-    # Build lookup structures
-    lookup = _build_activity_lookup(conn)
-    processed_ids = _load_processed_strava_ids(conn)
-    shoe_cache = {}
+def _sync_strava(client, conn, config: dict, dry_run: bool, verbose: bool,
+                 full_history: bool, fetch_streams: bool) -> dict:
+    """Body of sync_strava(); conn lifetime is managed by the caller."""
+    _migrate_schema(conn)
+
+    tolerance_pct = config.get("reconcile", {}).get("distance_tolerance_pct", 5)
 
-    # Determine fetch range
-    after = None
-    if not full_history:
-        after = _get_last_sync_timestamp(conn)
-        if verbose and after:
-            print(f"Fetching activities after {after.isoformat()}")
+    # Build lookup structures on a read-only connection; conn is kept for writes
+    read_conn = get_read_connection(config)
+    try:
+        lookup = _build_activity_lookup(read_conn)
+        processed_ids = _load_processed_strava_ids(read_conn)
+        shoe_cache = _load_shoe_cache(read_conn)
+        rate_limiter = _load_rate_limiter(read_conn)
+
+        # Determine fetch range
+        after = None
+        if not full_history:
+            after = _get_last_sync_timestamp(read_conn)
+    finally:
+        read_conn.close()
+    known_shoes = sum(1 for v in shoe_cache.values() if v is not None)
+
+    if verbose and after:
+        print(f"Fetching activities after {after.isoformat()}")
 
     if verbose:
         total_db = sum(len(v) for v in lookup.values())
         print(f"DB has {total_db} activities across {len(lookup)} dates")
         print(f"Already processed {len(processed_ids)} Strava activities")
 
-    # Fetch activity list from Strava
+    # Stream the activity list from Strava — pages are fetched lazily as the
+    # loop consumes them, so the first DB write doesn't wait on full pagination
     if verbose:
         print("Fetching activity list from Strava...")
 
-    strava_activities = []
-    try:
-        activities_iter = client.get_activities(after=after)
-        for act in activities_iter:
-            _update_rate_limiter(client, rate_limiter)
-            act_type = act.type.root if hasattr(act.type, 'root') else str(act.type)
-            if act_type in RUNNING_TYPES:
-                strava_activities.append(act)
-    except Exception as e:
-        print(f"Error fetching activity list: {e}")
-        conn.close()
-        return {"matched": 0, "unmatched": 0, "skipped": 0, "errors": 1,
-                "fields_filled": 0, "laps_inserted": 0, "streams_inserted": 0,
-                "shoes_created": 0, "rate_limit_pauses": 0, "details": []}
-
-    if verbose:
-        print(f"Found {len(strava_activities)} running activities on Strava")
+    # Honour quota carried over from a previous run before the first API call
+    if rate_limiter.check(verbose):
+        strava_activities = _iter_running_activities(client, after, rate_limiter)
+    else:
+        strava_activities = iter(())
 
     result = {
         "matched": 0, "unmatched": 0, "skipped": 0, "errors": 0,
@@ -859,13 +1000,30 @@ def sync_strava(config: dict, dry_run: bool = False, verbose: bool = False,
     }
 
     latest_timestamp = None
+    list_error = False
+    seen = 0
+
+    # Bind per-iteration callables once — the loop runs per Strava activity
+    rl_check = rate_limiter.check
+    details_append = result["details"].append
+    conn_execute = conn.execute
 
-    for strava_act in strava_activities:
+    while True:
+        try:
+            strava_act = next(strava_activities, None)
+        except Exception as e:
+            print(f"Error fetching activity list: {e}")
+            result["errors"] += 1
+            list_error = True
+            break
+        if strava_act is None:
+            break
+        seen += 1
         strava_id = str(strava_act.id)
 
         # Track latest activity for sync_state
-        if strava_act.start_date:
-            act_ts = strava_act.start_date
+        act_ts = strava_act.start_date
+        if act_ts:
             if hasattr(act_ts, 'timestamp'):
                 if latest_timestamp is None or act_ts > latest_timestamp:
                     latest_timestamp = act_ts
@@ -876,7 +1034,7 @@ def sync_strava(config: dict, dry_run: bool = False, verbose: bool = False,
             continue
 
         # Check rate limit
-        if not rate_limiter.check(verbose):
+        if not rl_check(verbose):
             result["rate_limit_pauses"] = rate_limiter.pause_count
             break
 
@@ -894,16 +1052,16 @@ def sync_strava(config: dict, dry_run: bool = False, verbose: bool = False,
                           f"(DB: {match['distance_mi']:.2f}mi)")
 
                 if not dry_run:
-                    # Merge NULL fields
-                    filled = _merge_fields(conn, activity_id, strava_data, verbose)
-                    result["fields_filled"] += len(filled)
+                    # Merge NULL fields (written together with shoe_id below)
+                    updates = _merge_fields(conn, activity_id, strava_data, verbose)
+                    result["fields_filled"] += len(updates)
 
                     # Insert activity source
                     src_id = _insert_activity_source(conn, activity_id, strava_data, match_status)
 
                     # Laps (skip if activity already has intervals from XLSX)
                     if not _activity_has_intervals(conn, activity_id):
-                        if rate_limiter.check(verbose):
+                        if rl_check(verbose):
                             lap_count = _fetch_and_insert_laps(
                                 client, conn, strava_id, activity_id, rate_limiter, verbose)
                             result["laps_inserted"] += lap_count
@@ -912,7 +1070,7 @@ def sync_strava(config: dict, dry_run: bool = False, verbose: bool = False,
 
                     # Streams
                     if fetch_streams and not _activity_has_streams(conn, activity_id):
-                        if rate_limiter.check(verbose):
+                        if rl_check(verbose):
                             stream_count = _fetch_and_insert_streams(
                                 client, conn, strava_id, activity_id, rate_limiter, verbose,
                                 source_id=src_id)
@@ -922,20 +1080,19 @@ def sync_strava(config: dict, dry_run: bool = False, verbose: bool = False,
 
                     # Shoe handling
                     if strava_data.get("gear_id"):
-                        if rate_limiter.check(verbose):
+                        if rl_check(verbose):
                             shoe_id = _ensure_shoe(
                                 conn, client, strava_data["gear_id"],
                                 shoe_cache, rate_limiter, verbose)
                             if shoe_id and match["shoe_id"] is None:
-                                conn.execute(
-                                    "UPDATE activities SET shoe_id = ?, updated_at = datetime('now') WHERE id = ?",
-                                    (shoe_id, activity_id),
-                                )
+                                updates["shoe_id"] = shoe_id
                                 if verbose:
                                     print(f"    SHOE → shoe #{shoe_id}")
 
+                    _apply_activity_updates(conn, activity_id, updates)
+
                     # Record in processed_files
-                    conn.execute(
+                    conn_execute(
                         "INSERT INTO processed_files (file_path, source, activity_id) VALUES (?, ?, ?)",
                         (f"strava:{strava_id}", "strava", activity_id),
                     )
@@ -947,7 +1104,7 @@ def sync_strava(config: dict, dry_run: bool = False, verbose: bool = False,
                         lookup[date] = [a for a in lookup[date] if a["id"] != activity_id]
 
                 result["matched"] += 1
-                result["details"].append({
+                details_append({
                     "strava_id": strava_id, "status": "matched",
                     "activity_id": activity_id, "date": strava_data["date"],
                 })
@@ -960,21 +1117,21 @@ def sync_strava(config: dict, dry_run: bool = False, verbose: bool = False,
 
                 if not dry_run:
                     _insert_activity_source(conn, None, strava_data, "unmatched")
-                    conn.execute(
+                    conn_execute(
                         "INSERT INTO processed_files (file_path, source) VALUES (?, ?)",
                         (f"strava:{strava_id}", "strava"),
                     )
                     conn.commit()
 
                 result["unmatched"] += 1
-                result["details"].append({
+                details_append({
                     "strava_id": strava_id, "status": "unmatched",
                     "date": strava_data["date"],
                 })
 
         except Exception as e:
             result["errors"] += 1
-            result["details"].append({
+            details_append({
                 "strava_id": strava_id, "status": "error", "error": str(e),
             })
             if verbose:
@@ -984,8 +1141,12 @@ def sync_strava(config: dict, dry_run: bool = False, verbose: bool = False,
             except Exception:
                 pass
 
-    # Update sync_state
-    if not dry_run and (result["matched"] > 0 or result["unmatched"] > 0):
+    if verbose:
+        print(f"Scanned {seen} running activities on Strava")
+
+    # Update sync_state (skip if the list fetch died mid-pagination, so the
+    # next incremental run doesn't jump past activities we never saw)
+    if not dry_run and not list_error and (result["matched"] > 0 or result["unmatched"] > 0):
         now = datetime.now(timezone.utc).isoformat()
         meta = {
             "matched": result["matched"],
@@ -1004,8 +1165,10 @@ def sync_strava(config: dict, dry_run: bool = False, verbose: bool = False,
         )
         conn.commit()
 
+    # Persisted even on dry runs — the API calls still counted against quota
+    _save_rate_limiter(conn, rate_limiter)
+
     result["rate_limit_pauses"] = rate_limiter.pause_count
-    result["shoes_created"] = len([v for v in shoe_cache.values() if v is not None])
+    result["shoes_created"] = sum(1 for v in shoe_cache.values() if v is not None) - known_shoes
 
-    conn.close()
     return result
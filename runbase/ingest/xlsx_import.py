@@ -2,17 +2,48 @@
 
 import json
 import re
+import zipfile
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
-from datetime import datetime, time
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
+from xml.etree import ElementTree
 
 import openpyxl
 
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from runbase.db import get_connection
 from runbase.ingest.fit_parser import format_pace, _compute_file_hash
 
 METERS_PER_MILE = 1609.344
 
+# Connection settings for the bulk import. Under WAL, synchronous=NORMAL
+# only fsyncs at checkpoints; the import is re-runnable if interrupted.
+IMPORT_PRAGMAS = {
+    "synchronous": "NORMAL",
+    "cache_size": -64000,  # KiB, i.e. 64 MB page cache
+}
+
+
+# Rows per task when parsing in a process pool (xlsx.parse_workers)
+PARSE_CHUNK_ROWS = 2000
+
+# SpreadsheetML namespace, for reading the active tab from xl/workbook.xml
+_SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
 
 # Column index mapping (0-based)
 COL_DATE = 0
@@ -24,24 +55,94 @@ COL_WORKOUT_TITLE = 10
 COL_RUN_TIME = 23
 COL_NOTE = 24
 
-# Non-running keywords for text cardio filtering
-NON_RUNNING_KEYWORDS = re.compile(
-    r'\b(hike|hiking|walk|walking|swim|swimming|bike|biking|cycling|'
-    r'off|rest|yoga|stretch|strength|weights|elliptical|rowing|cross[\s-]?train)\b',
+# Non-running keywords for text cardio filtering (matched as whole words)
+NON_RUNNING_WORDS = frozenset({
+    "hike", "hiking", "walk", "walking", "swim", "swimming", "bike", "biking",
+    "cycling", "off", "rest", "yoga", "stretch", "strength", "weights",
+    "elliptical", "rowing", "crosstrain",
+})
+# Exact cardio cell types _parse_rows classifies as numeric without calling _classify_row
+_NUMERIC_TYPES = frozenset({int, float})
+_WORD_RE = re.compile(r'\w+')
+# "cross train" / "cross-train" span two words, so they need the separator check
+_CROSS_TRAIN_RE = re.compile(r'\bcross[\s-]train\b')
+
+# Pace token: M:SS or MM:SS with optional tenths
+_PACE = r'\d{1,2}:\d{2}(?:\.\d)?'
+
+# H:MM:SS / MM:SS(.s) in one match; unusual inputs fall back to split parsing
+_CLOCK_RE = re.compile(r'(?:(\d+):)?(\d+):(\d+(?:\.\d+)?)')
+
+# Note patterns (see _parse_note)
+# The anchored note patterns are evaluated in one match: each sits in an
+# optional lookahead at position 0, so every pattern that matches fills its
+# own named groups and _parse_note applies them in cascade order.
+_NOTE_RE = re.compile(
+    # 0. Splits: X:XX-X:XX[-X:XX...][; text]
+    rf'(?:(?=(?P<splits>{_PACE}(?:\s*-\s*{_PACE})+)\s*[;.,]?\s*(?P<splits_rest>.*)$))?'
+    # 1. Full: pace, HR, cadence[; text]
+    rf'(?:(?=(?P<full_pace>{_PACE})\s*,\s*(?P<full_hr>\d{{2,3}})\s*,\s*(?P<full_cad>\d{{2,3}})\b'
+    rf'\s*[;.,]?\s*(?P<full_rest>.*)$))?'
+    # 2. Pace + HR: pace, HR[; text]
+    rf'(?:(?=(?P<hr_pace>{_PACE})\s*,\s*(?P<hr_hr>\d{{2,3}})\b\s*[;.,]?\s*(?P<hr_rest>.*)$))?'
+    # 3. Pace only: pace[; text], or pace followed by space-delimited text
+    rf'(?:(?=(?P<pace>{_PACE})\s*[;,]?\s*(?P<pace_rest>.*)$))?'
+    rf'(?:(?=(?P<space_pace>{_PACE})\s+(?P<space_rest>.+)$))?'
+)
+_PACE_TOKEN_RE = re.compile(_PACE)
+_LEADING_NUM_RE = re.compile(r'^\d{2,3}\b')
+_AT_PACE_RE = re.compile(rf'@({_PACE})')
+_NUM_2_3_RE = re.compile(r'\b(\d{2,3})\b')
+
+# Strides count (see _parse_strides)
+_STRIDES_RE = re.compile(r'(\d+\.?\d*)\s*strides', re.IGNORECASE)
+_STRIDES_PAREN_RE = re.compile(r'strides\s*\(\s*(\d+\.?\d*)\s*\)', re.IGNORECASE)
+
+# Workout category (see _parse_workout_category)
+_RACE_RE = re.compile(
+    r'\b\d+k\s+race\b|\b\d+\s*mile\s+race\b|\bmile\s+TT\b|'
+    r'\b\d+\s*TT\b|\bhalf\s+race\b|\bfull\s+race\b|'
+    r'\brace\b|\bgoal\s+mile\b|\beaster\s+mile\b',
     re.IGNORECASE,
 )
+# Cardio-note categories in priority order. Each alternative is a lookahead
+# from the start of the note, so the first category listed wins no matter
+# where its keyword appears; the empty named group makes m.lastgroup the
+# category name.
+_CN_CATEGORY_RE = re.compile(
+    r'^(?:'
+    r'(?=.*?(?:\bspeed\s+T\b|^ST$|\bspeed\s+T/R\b))(?P<tempo>)'
+    r'|(?=.*?\bspeed\s+I\b)(?P<interval>)'
+    r'|(?=.*?(?:\bspeed\s+R\b|\bspeed\s+R/I\b))(?P<repetition>)'
+    r'|(?=.*?\bspeed\s+F\b)(?P<fartlek>)'
+    r'|(?=.*?\bhills?\b)(?P<hills>)'
+    r')',
+    re.IGNORECASE | re.DOTALL,
+)
+_LONG_RE = re.compile(r'\blong\b')
+_STRIDES_WORD_RE = re.compile(r'\bstrides?\b')
+_SHAKEOUT_RE = re.compile(r'\bshake\s*out\b|\bpre[\s-]?race\b')
+
+# Text cardio (see _parse_text_row)
+_MILES_IN_TIME_RE = re.compile(r'(\d+\.?\d*)\s*miles?\s+in\s+(\d+:\d+(?::\d+)?)', re.IGNORECASE)
+_PAREN_PACE_RE = re.compile(r'\((\d+:\d+(?:\.\d)?)/mi')
+_MILES_RE = re.compile(r'(\d+\.?\d*)\s*miles?', re.IGNORECASE)
+
+# Interval distance (see _parse_interval_distance)
+_NX_DIST_RE = re.compile(r'(\d+)\s*x\s*(\d+\.?\d*)\s*(mile|mi|k|km|m)?\b', re.IGNORECASE)
+_K_AT_RE = re.compile(r'\d+k\s*@', re.IGNORECASE)
 
 
-@dataclass
+@dataclass(slots=True)
 class NoteParseResult:
     avg_pace_s_per_mi: float | None
     avg_hr: float | None
     avg_cadence: float | None
     free_text: str | None
-    splits_s: list[float] | None = None
+    splits_s: array | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ParsedRow:
     row_number: int
     date: str
@@ -61,7 +162,7 @@ class ParsedRow:
     pace_source: str | None
     strides: int | None = None
     workout_category: str | None = None
-    splits_s: list[float] | None = None
+    splits_s: array | None = None
 
 
 def import_xlsx(config: dict, dry_run: bool = False, verbose: bool = False) -> dict:
@@ -92,61 +193,107 @@ def import_xlsx(config: dict, dry_run: bool = False, verbose: bool = False) -> d
         return {"new": 0, "skipped": 0, "errors": 0, "skipped_non_running": 0,
                 "skipped_cutoff": 0, "parse_stats": {}, "already_imported": True}
 
-    raw_rows = _read_xlsx(xlsx_path)
+    # Rows stream from the workbook through parsing into the DB one at a time,
+    # so memory stays flat regardless of sheet size. xlsx.parse_workers > 1
+    # parses in a process pool instead, which only pays off on large sheets.
+    stats = {}
+    parse_workers = (config.get("xlsx") or {}).get("parse_workers")
+    if parse_workers and parse_workers > 1:
+        parsed_rows = _parse_rows_parallel(_iter_xlsx(xlsx_path), stats, parse_workers)
+    else:
+        parsed_rows = _parse_rows(_iter_xlsx(xlsx_path), stats)
+
+    result = {"new": 0, "skipped": 0, "errors": 0,
+              "skipped_non_running": 0, "skipped_cutoff": 0,
+              "parse_stats": stats}
+
+    # One transaction for the whole import: rows are written under per-row
+    # savepoints in _insert_row and committed together when the block exits
+    # (or rolled back if the import itself blows up)
+    if not dry_run:
+        _apply_import_pragmas(conn, config)
+        conn.execute("BEGIN")
+
+    with conn:
+        for row in parsed_rows:
+            # Apply cutoff date filter
+            if cutoff_date and row.date > cutoff_date:
+                result["skipped_cutoff"] += 1
+                continue
+            try:
+                activity_id = _insert_row(conn, row, xlsx_path, dry_run, verbose)
+                if dry_run or activity_id is not None:
+                    result["new"] += 1
+                else:
+                    result["skipped"] += 1
+            except Exception as e:
+                result["errors"] += 1
+                if verbose:
+                    print(f"  ERROR row {row.row_number}: {e}")
+
+        # Record processed file after all rows
+        if not dry_run and result["new"] > 0:
+            conn.execute(
+                "INSERT INTO processed_files (file_path, file_hash, source) VALUES (?, ?, ?)",
+                (xlsx_path, file_hash, "master_xlsx"),
+            )
+
+    result["skipped_non_running"] = stats.pop("non_running") + stats["text_skipped"]
     if verbose:
-        print(f"Read {len(raw_rows)} data rows from {xlsx_path}")
+        if result["skipped_cutoff"]:
+            print(f"Skipped {result['skipped_cutoff']} rows after cutoff date {cutoff_date}")
+        print(f"Skipped {result['skipped_non_running']} non-running rows")
+        print(f"Parse methods: {stats}")
 
-    parsed_rows, skipped_non_running, parse_stats = _parse_rows(raw_rows, verbose)
+    conn.close()
+    return result
 
-    # Apply cutoff date filter
-    skipped_cutoff = 0
-    if cutoff_date:
-        before = len(parsed_rows)
-        parsed_rows = [r for r in parsed_rows if r.date <= cutoff_date]
-        skipped_cutoff = before - len(parsed_rows)
-        if verbose and skipped_cutoff:
-            print(f"Skipped {skipped_cutoff} rows after cutoff date {cutoff_date}")
 
-    if verbose:
-        print(f"Parsed {len(parsed_rows)} running rows, skipped {skipped_non_running} non-running")
-        print(f"Parse methods: {parse_stats}")
+def _apply_import_pragmas(conn, config: dict) -> None:
+    """Relax durability for the bulk import; xlsx.pragmas in config overrides."""
+    pragmas = {**IMPORT_PRAGMAS, **((config.get("xlsx") or {}).get("pragmas") or {})}
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name}={value}")
 
-    result = {"new": 0, "skipped": 0, "errors": 0,
-              "skipped_non_running": skipped_non_running,
-              "skipped_cutoff": skipped_cutoff,
-              "parse_stats": parse_stats}
 
-    for row in parsed_rows:
-        try:
-            activity_id = _insert_row(conn, row, xlsx_path, dry_run, verbose)
-            if dry_run or activity_id is not None:
-                result["new"] += 1
-            else:
-                result["skipped"] += 1
-        except Exception as e:
-            result["errors"] += 1
-            if verbose:
-                print(f"  ERROR row {row.row_number}: {e}")
-
-    # Record processed file after all rows
-    if not dry_run and result["new"] > 0:
-        conn.execute(
-            "INSERT INTO processed_files (file_path, file_hash, source) VALUES (?, ?, ?)",
-            (xlsx_path, file_hash, "master_xlsx"),
+def _read_xlsx(path: str) -> list[dict]:
+    """Read XLSX, return list of raw row dicts with values by column index."""
+    return list(_iter_xlsx(path))
+
+
+def _iter_xlsx(path: str) -> Iterator[dict]:
+    """Yield raw row dicts with values by column index, one row at a time.
+
+    Reads the active sheet, through python-calamine when it's installed,
+    else openpyxl.
+    """
+    if CalamineWorkbook is not None:
+        sheet = CalamineWorkbook.from_path(path).get_sheet_by_index(_active_sheet_index(path))
+        yield from _raw_rows(
+            [_from_calamine(v) for v in row]
+            for row in sheet.to_python(skip_empty_area=False)
         )
-        conn.commit()
+        return
 
-    conn.close()
-    return result
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        yield from _raw_rows(wb.active.values)
+    finally:
+        wb.close()
 
 
-def _read_xlsx(path: str) -> list[dict]:
-    """Read XLSX, return list of raw row dicts with values by column index."""
-    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
-    ws = wb.active
-    rows = []
+def _active_sheet_index(path: str) -> int:
+    """Index of the workbook's active sheet, the one openpyxl's wb.active returns."""
+    with zipfile.ZipFile(path) as zf:
+        root = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+    view = root.find(f"{_SHEET_NS}bookViews/{_SHEET_NS}workbookView")
+    return int(view.get("activeTab", 0)) if view is not None else 0
+
 
-    for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+def _raw_rows(values: Iterator) -> Iterator[dict]:
+    """Turn sheet value rows (header first) into raw row dicts."""
+    next(values, None)  # header row
+    for row_idx, row in enumerate(values, start=2):
         # Must have a date and non-empty cardio
         if not row or len(row) <= COL_CARDIO:
             continue
@@ -158,7 +305,7 @@ def _read_xlsx(path: str) -> list[dict]:
         if isinstance(cardio_val, str) and not cardio_val.strip():
             continue
 
-        rows.append({
+        yield {
             "row_number": row_idx,
             "date": date_val,
             "intensity": row[COL_INTENSITY] if len(row) > COL_INTENSITY else None,
@@ -168,10 +315,20 @@ def _read_xlsx(path: str) -> list[dict]:
             "workout_title": row[COL_WORKOUT_TITLE] if len(row) > COL_WORKOUT_TITLE else None,
             "run_time": row[COL_RUN_TIME] if len(row) > COL_RUN_TIME else None,
             "note": row[COL_NOTE] if len(row) > COL_NOTE else None,
-        })
+        }
 
-    wb.close()
-    return rows
+
+def _from_calamine(val):
+    """Map a calamine cell value to what openpyxl would have returned."""
+    if val == "":
+        return None
+    if isinstance(val, float) and val.is_integer():
+        return int(val)
+    if isinstance(val, date) and not isinstance(val, datetime):
+        return datetime.combine(val, time())
+    if isinstance(val, timedelta) and val < timedelta(days=1):
+        return (datetime.min + val).time()
+    return val
 
 
 def _classify_row(raw: dict) -> str | None:
@@ -195,7 +352,11 @@ def _classify_row(raw: dict) -> str | None:
             pass
 
         # Check for non-running
-        if NON_RUNNING_KEYWORDS.search(cardio_stripped):
+        cardio_lower = cardio_stripped.lower()
+        words = set(_WORD_RE.findall(cardio_lower))
+        if not NON_RUNNING_WORDS.isdisjoint(words):
+            return None
+        if "cross" in words and _CROSS_TRAIN_RE.search(cardio_lower):
             return None
 
         # Has text — could be a text running entry
@@ -204,69 +365,119 @@ def _classify_row(raw: dict) -> str | None:
     return None
 
 
-def _parse_rows(raw_rows: list[dict], verbose: bool) -> tuple[list[ParsedRow], int, dict]:
-    """Classify and parse all rows.
+def _parse_rows(raw_rows: Iterable[dict], stats: dict) -> Iterator[ParsedRow]:
+    """Classify and parse rows lazily, yielding each running row as a ParsedRow.
 
-    Returns (parsed_rows, skipped_non_running_count, parse_stats).
+    Tallies parse methods into stats (numeric, text_with_time,
+    text_distance_only, text_skipped, plus non_running for rows classified
+    as another sport), filled in once the rows are exhausted.
     """
-    parsed = []
-    skipped_non_running = 0
-    parse_stats = {"numeric": 0, "text_with_time": 0, "text_distance_only": 0, "text_skipped": 0}
-
-    for raw in raw_rows:
-        row_type = _classify_row(raw)
+    n_numeric = n_text_time = n_text_dist = n_text_skipped = n_non_running = 0
 
-        if row_type is None:
-            skipped_non_running += 1
-            continue
+    try:
+        for raw in raw_rows:
+            # Most cardio cells are plain numbers; skip the classifier call for those
+            if type(raw["cardio"]) in _NUMERIC_TYPES:
+                row_type = "numeric"
+            else:
+                row_type = _classify_row(raw)
 
-        if row_type == "numeric":
-            row = _parse_numeric_row(raw)
-            parse_stats["numeric"] += 1
-            parsed.append(row)
+            if row_type is None:
+                n_non_running += 1
+                continue
 
-        elif row_type == "text":
-            row = _parse_text_row(raw)
-            if row is not None:
-                if row.parse_method == "text_with_time":
-                    parse_stats["text_with_time"] += 1
+            if row_type == "numeric":
+                row = _parse_numeric_row(raw)
+                n_numeric += 1
+                yield row
+
+            elif row_type == "text":
+                row = _parse_text_row(raw)
+                if row is not None:
+                    if row.parse_method == "text_with_time":
+                        n_text_time += 1
+                    else:
+                        n_text_dist += 1
+                    yield row
                 else:
-                    parse_stats["text_distance_only"] += 1
-                parsed.append(row)
-            else:
-                parse_stats["text_skipped"] += 1
-                skipped_non_running += 1
+                    n_text_skipped += 1
+    finally:
+        stats.update({"numeric": n_numeric, "text_with_time": n_text_time,
+                      "text_distance_only": n_text_dist,
+                      "text_skipped": n_text_skipped, "non_running": n_non_running})
+
 
-    return parsed, skipped_non_running, parse_stats
+def _parse_rows_parallel(raw_rows: Iterable[dict], stats: dict,
+                         workers: int) -> Iterator[ParsedRow]:
+    """Parse rows in a process pool, yielding ParsedRows in sheet order.
+
+    Same stats contract as _parse_rows, summed across chunks. At most
+    2 * workers chunks are in flight, so the sheet is read only as fast as
+    parsed rows are consumed (Executor.map would submit every chunk first).
+    """
+    stats.update(_parse_chunk(())[1])
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending = deque()
+        for chunk in _batched(raw_rows, PARSE_CHUNK_ROWS):
+            pending.append(ex.submit(_parse_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from _collect_chunk(pending.popleft(), stats)
+        while pending:
+            yield from _collect_chunk(pending.popleft(), stats)
+
+
+def _collect_chunk(future, stats: dict) -> list[ParsedRow]:
+    """Wait for one parsed chunk and add its stats to the running totals."""
+    rows, chunk_stats = future.result()
+    for key, n in chunk_stats.items():
+        stats[key] += n
+    return rows
+
+
+def _batched(items: Iterable, n: int) -> Iterator[tuple]:
+    """Tuples of up to n consecutive items (itertools.batched needs 3.12)."""
+    it = iter(items)
+    while chunk := tuple(islice(it, n)):
+        yield chunk
+
+
+def _parse_chunk(raw_rows: Iterable[dict]) -> tuple[list[ParsedRow], dict]:
+    """Parse one chunk of rows in a worker process."""
+    stats = {}
+    rows = list(_parse_rows(raw_rows, stats))
+    return rows, stats
 
 
 def _parse_strides(cardio_note: str | None, workout_title: str | None) -> int | None:
     """Extract strides count from cardio_note (col 9) or workout_title (col 10).
 
     Matches patterns like "4 strides", "strides(6)", "6strides", "6.5 strides".
-    Returns rounded integer count, or None if no count found.
+    Expects cleaned strings (see _clean). Returns rounded integer count,
+    or None if no count found.
     """
     for text in (cardio_note, workout_title):
         if not text:
             continue
-        m = re.search(r'(\d+\.?\d*)\s*strides', str(text), re.IGNORECASE)
+        m = _STRIDES_RE.search(text)
         if m:
             return round(float(m.group(1)))
         # Also match "strides(N)" and "strides (N)"
-        m = re.search(r'strides\s*\(\s*(\d+\.?\d*)\s*\)', str(text), re.IGNORECASE)
+        m = _STRIDES_PAREN_RE.search(text)
         if m:
             return round(float(m.group(1)))
     return None
 
 
+@lru_cache(maxsize=512)
 def _parse_workout_category(cardio_note: str | None, workout_title: str | None) -> str | None:
     """Classify workout category from cardio_note (col 9) and workout_title (col 10).
 
     Returns one of: tempo, interval, repetition, fartlek, hills, race, long, easy, strides.
     Returns None only if no classification can be made (caller should default to 'easy').
+    Expects cleaned strings (see _clean).
     """
-    cn = str(cardio_note).strip() if cardio_note else ""
-    wt = str(workout_title).strip() if workout_title else ""
+    cn = cardio_note or ""
+    wt = workout_title or ""
     cn_lower = cn.lower()
     wt_lower = wt.lower()
 
@@ -275,39 +486,24 @@ def _parse_workout_category(cardio_note: str | None, workout_title: str | None)
         return None
 
     # Race detection — check both fields
-    race_patterns = (
-        r'\b\d+k\s+race\b', r'\b\d+\s*mile\s+race\b', r'\bmile\s+TT\b',
-        r'\b\d+\s*TT\b', r'\bhalf\s+race\b', r'\bfull\s+race\b',
-        r'\brace\b', r'\bgoal\s+mile\b', r'\beaster\s+mile\b',
-    )
-    for pat in race_patterns:
-        if re.search(pat, cn, re.IGNORECASE) or re.search(pat, wt, re.IGNORECASE):
-            return "race"
-
-    # Speed workout types from cardio_note
-    if re.search(r'\bspeed\s+T\b|^ST$|\bspeed\s+T/R\b', cn, re.IGNORECASE):
-        return "tempo"
-    if re.search(r'\bspeed\s+I\b', cn, re.IGNORECASE):
-        return "interval"
-    if re.search(r'\bspeed\s+R\b|\bspeed\s+R/I\b', cn, re.IGNORECASE):
-        return "repetition"
-    if re.search(r'\bspeed\s+F\b', cn, re.IGNORECASE):
-        return "fartlek"
-
-    # Hills
-    if re.search(r'\bhills?\b', cn_lower):
-        return "hills"
+    if _RACE_RE.search(cn) or _RACE_RE.search(wt):
+        return "race"
+
+    # Speed workout types and hills from cardio_note
+    m = _CN_CATEGORY_RE.match(cn)
+    if m:
+        return m.lastgroup
 
     # Long run — check workout_title
-    if re.search(r'\blong\b', wt_lower):
+    if _LONG_RE.search(wt_lower):
         return "long"
 
     # Strides-only (no speed/race keywords above matched)
-    if re.search(r'\bstrides?\b', cn_lower) or re.search(r'\bstrides?\b', wt_lower):
+    if _STRIDES_WORD_RE.search(cn_lower) or _STRIDES_WORD_RE.search(wt_lower):
         return "easy"
 
     # Pre-race / shake out
-    if re.search(r'\bshake\s*out\b|\bpre[\s-]?race\b', cn_lower):
+    if _SHAKEOUT_RE.search(cn_lower):
         return "easy"
 
     # If cardio_note is empty, default easy
@@ -317,6 +513,16 @@ def _parse_workout_category(cardio_note: str | None, workout_title: str | None)
     return None
 
 
+def _clean(val) -> str | None:
+    """Stringify and strip a cell value; None for empty or "None" cells."""
+    if val is None:
+        return None
+    s = str(val).strip()
+    if s == "" or s == "None":
+        return None
+    return s
+
+
 def _parse_numeric_row(raw: dict) -> ParsedRow:
     """Parse a row with numeric cardio (distance in miles)."""
     date_str = _normalize_date(raw["date"])
@@ -332,10 +538,7 @@ def _parse_numeric_row(raw: dict) -> ParsedRow:
     duration_s = _time_to_seconds(raw.get("run_time"))
 
     # Note parsing
-    raw_note = raw.get("note")
-    note_str = str(raw_note).strip() if raw_note is not None else None
-    if note_str == "" or note_str == "None":
-        note_str = None
+    note_str = _clean(raw.get("note"))
 
     note_result = _parse_note(note_str) if note_str else NoteParseResult(None, None, None, None)
 
@@ -360,16 +563,10 @@ def _parse_numeric_row(raw: dict) -> ParsedRow:
         avg_pace_display = format_pace(avg_pace)
 
     # Workout name: col 10 only (col 9 is category/strides metadata)
-    workout_name = None
-    wt = raw.get("workout_title")
-    if wt and str(wt).strip():
-        workout_name = str(wt).strip()
+    workout_name = _clean(raw.get("workout_title"))
 
     # Strides and workout category
-    cardio_note = raw.get("cardio_note")
-    cn_str = str(cardio_note).strip() if cardio_note else None
-    if cn_str == "" or cn_str == "None":
-        cn_str = None
+    cn_str = _clean(raw.get("cardio_note"))
 
     strides = _parse_strides(cn_str, workout_name)
     workout_category = _parse_workout_category(cn_str, workout_name)
@@ -430,14 +627,14 @@ def _parse_text_row(raw: dict) -> ParsedRow | None:
     parse_method = "text_distance_only"
 
     # Try "X miles in HH:MM:SS" pattern
-    m = re.search(r'(\d+\.?\d*)\s*miles?\s+in\s+(\d+:\d+(?::\d+)?)', cardio_text, re.IGNORECASE)
+    m = _MILES_IN_TIME_RE.search(cardio_text)
     if m:
         distance_mi = round(float(m.group(1)), 2)
         duration_s = _time_str_to_seconds(m.group(2))
         parse_method = "text_with_time"
 
         # Check for parenthetical pace
-        pace_m = re.search(r'\((\d+:\d+(?:\.\d)?)/mi', cardio_text)
+        pace_m = _PAREN_PACE_RE.search(cardio_text)
         if pace_m:
             avg_pace = _pace_str_to_seconds(pace_m.group(1))
             pace_source = "text_parsed"
@@ -446,7 +643,7 @@ def _parse_text_row(raw: dict) -> ParsedRow | None:
             pace_source = "computed"
     else:
         # Distance-only: "X miles"
-        m2 = re.search(r'(\d+\.?\d*)\s*miles?', cardio_text, re.IGNORECASE)
+        m2 = _MILES_RE.search(cardio_text)
         if m2:
             distance_mi = round(float(m2.group(1)), 2)
         else:
@@ -475,16 +672,10 @@ def _parse_text_row(raw: dict) -> ParsedRow | None:
             pass
 
     # Workout name: col 10 only
-    workout_name = None
-    wt = raw.get("workout_title")
-    if wt and str(wt).strip():
-        workout_name = str(wt).strip()
+    workout_name = _clean(raw.get("workout_title"))
 
     # Strides and workout category
-    cardio_note = raw.get("cardio_note")
-    cn_str = str(cardio_note).strip() if cardio_note else None
-    if cn_str == "" or cn_str == "None":
-        cn_str = None
+    cn_str = _clean(raw.get("cardio_note"))
 
     strides = _parse_strides(cn_str, workout_name)
     workout_category = _parse_workout_category(cn_str, workout_name)
@@ -529,66 +720,54 @@ def _parse_note(note: str) -> NoteParseResult:
 
     note = note.strip()
 
+    m = _NOTE_RE.match(note)
+
     # 0. Splits at start: X:XX-X:XX[-X:XX...][; text]
     #    Two or more dash-separated times at the beginning of the note
-    m = re.match(
-        r'^(\d{1,2}:\d{2}(?:\.\d)?(?:\s*-\s*\d{1,2}:\d{2}(?:\.\d)?)+)\s*[;.,]?\s*(.*)$',
-        note,
-    )
-    if m:
-        splits_str = m.group(1)
-        splits = [_pace_str_to_seconds(s) for s in re.split(r'\s*-\s*', splits_str)]
-        avg_pace = round(sum(splits) / len(splits), 1)
-        free = m.group(2).strip() or None
-        if all(60 <= s <= 900 for s in splits):
+    splits_str = m.group("splits")
+    if splits_str is not None:
+        splits = array("d", [_pace_str_to_seconds(s) for s in _PACE_TOKEN_RE.findall(splits_str)])
+        if 60 <= min(splits) and max(splits) <= 900:
+            avg_pace = round(sum(splits) / len(splits), 1)
+            free = m.group("splits_rest").strip() or None
             return NoteParseResult(avg_pace, None, None, free, splits_s=splits)
 
     # 1. Full: pace, HR, cadence[; text]
-    m = re.match(
-        r'^(\d{1,2}:\d{2}(?:\.\d)?)\s*,\s*(\d{2,3})\s*,\s*(\d{2,3})\b\s*[;.,]?\s*(.*)$',
-        note,
-    )
-    if m:
-        pace = _pace_str_to_seconds(m.group(1))
-        hr = float(m.group(2))
-        cadence = float(m.group(3))
-        free = m.group(4).strip() or None
+    if m.group("full_pace") is not None:
+        pace = _pace_str_to_seconds(m.group("full_pace"))
+        hr = float(m.group("full_hr"))
+        cadence = float(m.group("full_cad"))
+        free = m.group("full_rest").strip() or None
         if 240 <= pace <= 900 and 80 <= hr <= 220:
             return NoteParseResult(pace, hr, cadence, free)
 
     # 2. Pace + HR: pace, HR[; text]
-    m = re.match(
-        r'^(\d{1,2}:\d{2}(?:\.\d)?)\s*,\s*(\d{2,3})\b\s*[;.,]?\s*(.*)$',
-        note,
-    )
-    if m:
-        pace = _pace_str_to_seconds(m.group(1))
-        hr = float(m.group(2))
-        remaining = m.group(3).strip()
+    if m.group("hr_pace") is not None:
+        pace = _pace_str_to_seconds(m.group("hr_pace"))
+        hr = float(m.group("hr_hr"))
+        remaining = m.group("hr_rest").strip()
         # Reject if remaining starts with 2-3 digit number (would be cadence → should match pattern 1)
-        if not re.match(r'^\d{2,3}\b', remaining):
+        if not _LEADING_NUM_RE.match(remaining):
             if 240 <= pace <= 900 and 80 <= hr <= 220:
                 free = remaining or None
                 return NoteParseResult(pace, hr, None, free)
 
     # 3. Pace only: pace[; text]
-    m = re.match(r'^(\d{1,2}:\d{2}(?:\.\d)?)\s*[;,]?\s*(.*)$', note)
-    if m:
-        pace = _pace_str_to_seconds(m.group(1))
-        free = m.group(2).strip() or None
+    if m.group("pace") is not None:
+        pace = _pace_str_to_seconds(m.group("pace"))
+        free = m.group("pace_rest").strip() or None
         if 240 <= pace <= 900:
             return NoteParseResult(pace, None, None, free)
 
     # Also try space-delimited pace
-    m = re.match(r'^(\d{1,2}:\d{2}(?:\.\d)?)\s+(.+)$', note)
-    if m:
-        pace = _pace_str_to_seconds(m.group(1))
-        free = m.group(2).strip() or None
+    if m.group("space_pace") is not None:
+        pace = _pace_str_to_seconds(m.group("space_pace"))
+        free = m.group("space_rest").strip() or None
         if 240 <= pace <= 900:
             return NoteParseResult(pace, None, None, free)
 
     # 4. @pattern: ...@pace HR cadence...
-    m = re.search(r'@(\d{1,2}:\d{2}(?:\.\d)?)', note)
+    m = _AT_PACE_RE.search(note)
     if m:
         pace = _pace_str_to_seconds(m.group(1))
         if 240 <= pace <= 900:
@@ -597,7 +776,7 @@ def _parse_note(note: str) -> NoteParseResult:
             hr = None
             cadence = None
 
-            nums = re.findall(r'\b(\d{2,3})\b', after)
+            nums = _NUM_2_3_RE.findall(after)
             for n in nums:
                 val = int(n)
                 if hr is None and 80 <= val <= 220:
@@ -609,9 +788,9 @@ def _parse_note(note: str) -> NoteParseResult:
             free_text = note[:m.start()].strip()
             remaining_after = after
             if hr is not None:
-                remaining_after = re.sub(r'\b' + str(int(hr)) + r'\b', '', remaining_after, count=1)
+                remaining_after = _remove_word(remaining_after, str(int(hr)))
             if cadence is not None:
-                remaining_after = re.sub(r'\b' + str(int(cadence)) + r'\b', '', remaining_after, count=1)
+                remaining_after = _remove_word(remaining_after, str(int(cadence)))
             remaining_after = remaining_after.strip(' ,;.')
             if remaining_after:
                 free_text = (free_text + " " + remaining_after).strip() if free_text else remaining_after
@@ -623,6 +802,24 @@ def _parse_note(note: str) -> NoteParseResult:
     return NoteParseResult(None, None, None, note)
 
 
+def _remove_word(text: str, word: str) -> str:
+    """Remove the first standalone occurrence of word (like re.sub on \\bword\\b)."""
+    start = text.find(word)
+    while start != -1:
+        end = start + len(word)
+        if ((start == 0 or not _is_word_char(text[start - 1]))
+                and (end == len(text) or not _is_word_char(text[end]))):
+            return text[:start] + text[end:]
+        start = text.find(word, start + 1)
+    return text
+
+
+def _is_word_char(c: str) -> bool:
+    """Match the regex \\w definition for a single character."""
+    return c.isalnum() or c == "_"
+
+
+@lru_cache(maxsize=512)
 def _parse_interval_distance(workout_name: str | None) -> float | None:
     """Parse per-interval distance in miles from workout name.
 
@@ -638,7 +835,7 @@ def _parse_interval_distance(workout_name: str | None) -> float | None:
         return None
 
     # NxDIST pattern: e.g. "4x800", "3x1 mile", "5x1k"
-    m = re.search(r'(\d+)\s*x\s*(\d+\.?\d*)\s*(mile|mi|k|km|m)?\b', workout_name, re.IGNORECASE)
+    m = _NX_DIST_RE.search(workout_name)
     if m:
         dist_val = float(m.group(2))
         unit = (m.group(3) or "").lower()
@@ -657,7 +854,7 @@ def _parse_interval_distance(workout_name: str | None) -> float | None:
                 return round(dist_val / METERS_PER_MILE, 4)
 
     # Race/tempo pattern: "5k @ t" — mile splits of a continuous effort
-    if re.search(r'\d+k\s*@', workout_name, re.IGNORECASE):
+    if _K_AT_RE.search(workout_name):
         return 1.0
 
     return None
@@ -679,6 +876,8 @@ def _insert_row(conn, parsed: ParsedRow, xlsx_path: str,
         return None
 
     cursor = conn.cursor()
+    # Savepoint so a failing row rolls back alone inside the import transaction
+    cursor.execute("SAVEPOINT xlsx_row")
     try:
         # 1. Insert activity (shoe_id stored in metadata only — shoes table not populated yet)
         cursor.execute(
@@ -705,7 +904,7 @@ def _insert_row(conn, parsed: ParsedRow, xlsx_path: str,
             "xlsx_shoe_id": parsed.shoe_id,
         }
         if parsed.splits_s:
-            metadata["splits_s"] = parsed.splits_s
+            metadata["splits_s"] = parsed.splits_s.tolist()
             metadata["splits_display"] = [format_pace(s) for s in parsed.splits_s]
 
         # Build metrics dict for notes field
@@ -731,32 +930,22 @@ def _insert_row(conn, parsed: ParsedRow, xlsx_path: str,
              xlsx_path,
              parsed.distance_mi, parsed.duration_s, parsed.avg_pace_s_per_mi,
              parsed.avg_hr, parsed.avg_cadence,
-             parsed.workout_name, json.dumps(metrics) if metrics else None,
-             json.dumps(metadata)),
+             parsed.workout_name, _dumps(metrics) if metrics else None,
+             _dumps(metadata)),
         )
 
         # 3. Insert intervals from splits
         if parsed.splits_s:
-            interval_dist = _parse_interval_distance(parsed.workout_name)
-            for i, split_duration_s in enumerate(parsed.splits_s, start=1):
-                # splits_s are durations (time for the rep), not pace/mi
-                split_pace = None
-                split_pace_display = None
-                if interval_dist and interval_dist > 0:
-                    split_pace = round(split_duration_s / interval_dist, 1)
-                    split_pace_display = format_pace(split_pace)
-                cursor.execute(
-                    """INSERT INTO intervals
-                       (activity_id, rep_number, prescribed_distance_mi,
-                        gps_measured_distance_mi, duration_s,
-                        avg_pace_s_per_mi, avg_pace_display, is_recovery)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (activity_id, i, interval_dist,
-                     interval_dist, split_duration_s,
-                     split_pace, split_pace_display, False),
-                )
-
-        conn.commit()
+            cursor.executemany(
+                """INSERT INTO intervals
+                   (activity_id, rep_number, prescribed_distance_mi,
+                    gps_measured_distance_mi, duration_s,
+                    avg_pace_s_per_mi, avg_pace_display, is_recovery)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                _interval_params(activity_id, parsed),
+            )
+
+        cursor.execute("RELEASE xlsx_row")
 
         if verbose:
             pace_str = parsed.avg_pace_display or "N/A"
@@ -767,22 +956,55 @@ def _insert_row(conn, parsed: ParsedRow, xlsx_path: str,
         return activity_id
 
     except Exception:
-        conn.rollback()
+        cursor.execute("ROLLBACK TO xlsx_row")
+        cursor.execute("RELEASE xlsx_row")
         raise
 
 
+def _dumps(obj) -> str:
+    """Serialize to JSON text, through orjson when it's installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def _interval_params(activity_id: int, parsed: ParsedRow) -> list[tuple]:
+    """Build intervals INSERT parameters for a row's splits."""
+    interval_dist = _parse_interval_distance(parsed.workout_name)
+    params = []
+    for i, split_duration_s in enumerate(parsed.splits_s, start=1):
+        # splits_s are durations (time for the rep), not pace/mi
+        split_pace = None
+        split_pace_display = None
+        if interval_dist and interval_dist > 0:
+            split_pace = round(split_duration_s / interval_dist, 1)
+            split_pace_display = format_pace(split_pace)
+        params.append((activity_id, i, interval_dist,
+                       interval_dist, split_duration_s,
+                       split_pace, split_pace_display, False))
+    return params
+
+
 def _normalize_date(val) -> str:
     """Convert date value to YYYY-MM-DD string."""
     if isinstance(val, datetime):
-        return val.strftime("%Y-%m-%d")
+        return f"{val.year:04d}-{val.month:02d}-{val.day:02d}"
     if isinstance(val, str):
+        s = val.strip()
+        # Fast path: already YYYY-MM-DD
+        if len(s) == 10 and s[4] == "-" and s[7] == "-" and s.isascii():
+            try:
+                date.fromisoformat(s)
+                return s
+            except ValueError:
+                pass
         # Try common formats
         for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y"):
             try:
-                return datetime.strptime(val.strip(), fmt).strftime("%Y-%m-%d")
+                return datetime.strptime(s, fmt).strftime("%Y-%m-%d")
             except ValueError:
                 continue
-        return val.strip()
+        return s
     return str(val)
 
 
@@ -809,7 +1031,12 @@ def _time_to_seconds(val) -> float | None:
 
 def _time_str_to_seconds(s: str) -> float:
     """Convert 'H:MM:SS' or 'MM:SS' string to seconds."""
-    parts = s.strip().split(":")
+    s = s.strip()
+    m = _CLOCK_RE.fullmatch(s)
+    if m:
+        h, mn, sec = m.groups()
+        return (int(h) * 3600 if h else 0) + int(mn) * 60 + float(sec)
+    parts = s.split(":")
     if len(parts) == 3:
         return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
     elif len(parts) == 2:
@@ -820,7 +1047,11 @@ def _time_str_to_seconds(s: str) -> float:
 
 def _pace_str_to_seconds(s: str) -> float:
     """Convert pace string like '7:30' or '7:30.5' to seconds per mile."""
-    parts = s.strip().split(":")
+    s = s.strip()
+    m = _CLOCK_RE.fullmatch(s)
+    if m and m.group(1) is None:
+        return int(m.group(2)) * 60 + float(m.group(3))
+    parts = s.split(":")
     if len(parts) == 2:
         minutes = int(parts[0])
         secs = float(parts[1])
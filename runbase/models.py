@@ -1,8 +1,8 @@
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import NamedTuple, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Activity:
     id: Optional[int] = None
     date: str = ""
@@ -32,7 +32,7 @@ class Activity:
     updated_at: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ActivitySource:
     id: Optional[int] = None
     activity_id: Optional[int] = None
@@ -53,7 +53,7 @@ class ActivitySource:
     imported_at: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Interval:
     id: Optional[int] = None
     activity_id: Optional[int] = None
@@ -77,8 +77,7 @@ class Interval:
     source: Optional[str] = None
 
 
-@dataclass
-class Stream:
+class Stream(NamedTuple):
     id: Optional[int] = None
     activity_id: Optional[int] = None
     timestamp_s: Optional[float] = None
@@ -91,7 +90,7 @@ class Stream:
     distance_mi: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class VdotEntry:
     id: Optional[int] = None
     effective_date: str = ""
@@ -102,7 +101,7 @@ class VdotEntry:
     created_at: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Shoe:
     id: Optional[int] = None
     name: str = ""
@@ -114,7 +113,7 @@ class Shoe:
     notes: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Conflict:
     id: Optional[int] = None
     activity_id: Optional[int] = None
@@ -127,7 +126,7 @@ class Conflict:
     resolved_at: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class RunalyzeMetrics:
     id: Optional[int] = None
     activity_id: Optional[int] = None
@@ -142,7 +141,7 @@ class RunalyzeMetrics:
     raw_csv_json: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SyncState:
     id: Optional[int] = None
     source: str = ""
@@ -151,7 +150,7 @@ class SyncState:
     metadata_json: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessedFile:
     id: Optional[int] = None
     file_path: str = ""
@@ -161,7 +160,7 @@ class ProcessedFile:
     activity_id: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ActivityOverride:
     id: Optional[int] = None
     activity_id: Optional[int] = None
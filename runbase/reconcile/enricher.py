@@ -2,6 +2,7 @@
 
 import json
 import re
+from functools import lru_cache
 
 
 # Strava workout_type mapping (for runs):
@@ -12,6 +13,10 @@ STRAVA_WORKOUT_TYPE_MAP = {
     3: "workout",  # refined below from name patterns
 }
 
+# Rank workout_type for picking a group's primary orphan:
+# race=1 > long=2 > workout=3 > default/None=99
+WORKOUT_TYPE_PRIORITY = {1: 0, 2: 1, 3: 2}
+
 # Name-based category patterns (checked against Strava activity name)
 CATEGORY_PATTERNS = [
     (re.compile(r"\brace\b", re.IGNORECASE), "race"),
@@ -29,6 +34,28 @@ CATEGORY_PATTERNS = [
     (re.compile(r"\bcooldown\b|\bcool.down\b", re.IGNORECASE), "easy"),
 ]
 
+# All CATEGORY_PATTERNS in one regex. Each alternative is a lookahead over the
+# whole name, so the first pattern in list order wins, not the leftmost match.
+_CATEGORY_RE = re.compile(
+    "|".join(
+        rf"(?=(?s:.)*?(?:{pattern.pattern}))(?P<c{i}>)"
+        for i, (pattern, _) in enumerate(CATEGORY_PATTERNS)
+    ),
+    re.IGNORECASE,
+)
+_CATEGORY_BY_GROUP = {f"c{i}": cat for i, (_, cat) in enumerate(CATEGORY_PATTERNS)}
+
+
+@lru_cache(maxsize=1024)
+def _match_category(name: str) -> str | None:
+    """First CATEGORY_PATTERNS category found in name, or None.
+
+    Cached: Strava names repeat heavily ("Morning Run", "Lunch Run"), so a
+    bulk reconcile or promote pass scans each distinct name once.
+    """
+    m = _CATEGORY_RE.match(name)
+    return _CATEGORY_BY_GROUP[m.lastgroup] if m else None
+
 
 def _infer_category(strava_source: dict) -> str | None:
     """Infer workout_category from Strava workout_type int and name patterns."""
@@ -43,21 +70,14 @@ def _infer_category(strava_source: dict) -> str | None:
             return category
         # workout_type=3 ("workout") — refine from name
         if category == "workout":
-            for pattern, cat in CATEGORY_PATTERNS:
-                if pattern.search(name):
-                    return cat
-            return "workout"
+            return _match_category(name) or "workout"
 
     # Fall back to name pattern matching
-    for pattern, cat in CATEGORY_PATTERNS:
-        if pattern.search(name):
-            return cat
-
-    return None
+    return _match_category(name)
 
 
 def enrich_from_strava(conn, activity_id: int, strava_source: dict,
-                       verbose: bool = False) -> dict:
+                       verbose: bool = False, orphans=None) -> dict:
     """Enrich an activity with data from a matched orphaned Strava source.
 
     Actions:
@@ -66,7 +86,8 @@ def enrich_from_strava(conn, activity_id: int, strava_source: dict,
       3. Set workout_name if missing or generic
       4. Set workout_category if missing
 
-    Returns dict with keys describing what was updated.
+    orphans is the pass's OrphanCache, if any; the linked source is dropped
+    from it. Returns dict with keys describing what was updated.
     """
     result = {"linked": False, "shoe_set": False, "name_set": False, "category_set": False}
     source_id = strava_source["id"]
@@ -76,6 +97,8 @@ def enrich_from_strava(conn, activity_id: int, strava_source: dict,
         "UPDATE activity_sources SET activity_id = ? WHERE id = ?",
         (activity_id, source_id),
     )
+    if orphans is not None:
+        orphans.discard(conn, [source_id])
     result["linked"] = True
 
     # Load current activity state
@@ -87,30 +110,23 @@ def enrich_from_strava(conn, activity_id: int, strava_source: dict,
         return result
 
     current_shoe_id, current_name, current_category = row
+    updates = {}
 
     # 2. Shoe: look up by Strava gear_id
     gear_id = strava_source.get("gear_id")
     if gear_id and current_shoe_id is None:
-        shoe_row = conn.execute(
-            "SELECT id FROM shoes WHERE strava_gear_id = ?", (gear_id,)
-        ).fetchone()
-        if shoe_row:
-            conn.execute(
-                "UPDATE activities SET shoe_id = ?, updated_at = datetime('now') WHERE id = ?",
-                (shoe_row[0], activity_id),
-            )
+        shoe_id = _lookup_shoe_id(conn, gear_id)
+        if shoe_id is not None:
+            updates["shoe_id"] = shoe_id
             result["shoe_set"] = True
             if verbose:
-                print(f"    SHOE → shoe #{shoe_row[0]}")
+                print(f"    SHOE → shoe #{shoe_id}")
 
     # 3. Workout name: replace if NULL or generic
     strava_name = strava_source.get("strava_name") or strava_source.get("workout_name")
     generic_names = {None, "", "Outdoor Running", "Running"}
     if current_name in generic_names and strava_name and strava_name not in generic_names:
-        conn.execute(
-            "UPDATE activities SET workout_name = ?, updated_at = datetime('now') WHERE id = ?",
-            (strava_name, activity_id),
-        )
+        updates["workout_name"] = strava_name
         result["name_set"] = True
         if verbose:
             print(f"    NAME → \"{strava_name}\"")
@@ -119,19 +135,23 @@ def enrich_from_strava(conn, activity_id: int, strava_source: dict,
     if current_category is None:
         category = _infer_category(strava_source)
         if category:
-            conn.execute(
-                "UPDATE activities SET workout_category = ?, updated_at = datetime('now') WHERE id = ?",
-                (category, activity_id),
-            )
+            updates["workout_category"] = category
             result["category_set"] = True
             if verbose:
                 print(f"    CATEGORY → {category}")
 
+    if updates:
+        assignments = ", ".join(f"{col} = ?" for col in updates)
+        conn.execute(
+            f"UPDATE activities SET {assignments}, updated_at = datetime('now') WHERE id = ?",
+            (*updates.values(), activity_id),
+        )
+
     return result
 
 
 def enrich_group_from_strava(conn, activity_id: int, group: list[dict],
-                              verbose: bool = False) -> dict:
+                              verbose: bool = False, orphans=None) -> dict:
     """Enrich an activity from a group of orphaned Strava sources.
 
     Picks the "primary" orphan (highest workout_type, or longest distance)
@@ -139,29 +159,20 @@ def enrich_group_from_strava(conn, activity_id: int, group: list[dict],
 
     Returns dict with keys: linked_count, shoe_set, name_set, category_set.
     """
-    # Rank workout_type: race=1 > long=2 > workout=3 > default/None=99
-    WORKOUT_TYPE_PRIORITY = {1: 0, 2: 1, 3: 2}
-
-    def primary_sort_key(orphan):
-        meta = orphan.get("metadata", {})
-        wt = meta.get("workout_type")
-        priority = WORKOUT_TYPE_PRIORITY.get(wt, 99)
-        # Negative distance so larger distance sorts first within same priority
-        dist = -(orphan.get("distance_mi") or 0)
-        return (priority, dist)
-
-    sorted_group = sorted(group, key=primary_sort_key)
-    primary = sorted_group[0]
+    primary = _pick_primary(group)
 
     # Enrich from primary (sets name, category, shoe, and links it)
-    result = enrich_from_strava(conn, activity_id, primary, verbose=verbose)
+    result = enrich_from_strava(conn, activity_id, primary, verbose=verbose,
+                                orphans=orphans)
 
     # Link remaining orphans (just set activity_id, don't re-enrich)
-    for orphan in sorted_group[1:]:
-        conn.execute(
-            "UPDATE activity_sources SET activity_id = ? WHERE id = ?",
-            (activity_id, orphan["id"]),
-        )
+    rest = [o for o in group if o is not primary]
+    conn.executemany(
+        "UPDATE activity_sources SET activity_id = ? WHERE id = ?",
+        [(activity_id, orphan["id"]) for orphan in rest],
+    )
+    if orphans is not None:
+        orphans.discard(conn, [o["id"] for o in rest])
 
     result["linked_count"] = len(group)
     return result
@@ -177,18 +188,15 @@ def _lookup_shoe_id(conn, gear_id: str | None) -> int | None:
     return row[0] if row else None
 
 
-def _pick_primary(group: list[dict]) -> dict:
-    """Pick the primary orphan from a same-day group for name/category/shoe."""
-    WORKOUT_TYPE_PRIORITY = {1: 0, 2: 1, 3: 2}
+def _primary_sort_key(orphan: dict) -> tuple:
+    """Rank by workout_type priority, then longest distance first."""
+    priority = WORKOUT_TYPE_PRIORITY.get(orphan["metadata"].get("workout_type"), 99)
+    return (priority, -(orphan.get("distance_mi") or 0))
 
-    def sort_key(orphan):
-        meta = orphan.get("metadata", {})
-        wt = meta.get("workout_type")
-        priority = WORKOUT_TYPE_PRIORITY.get(wt, 99)
-        dist = -(orphan.get("distance_mi") or 0)
-        return (priority, dist)
 
-    return sorted(group, key=sort_key)[0]
+def _pick_primary(group: list[dict]) -> dict:
+    """Pick the primary orphan from a same-day group for name/category/shoe."""
+    return min(group, key=_primary_sort_key)
 
 
 def _map_workout_type(strava_workout_type) -> str | None:
@@ -1,24 +1,48 @@
-"""Find orphaned Strava activity_sources that match a given date + distance."""
+"""Find orphaned Strava activity_sources that match a given date + distance.
+
+Only the stdlib (and orjson, when installed) is imported at module load.
+The Strava client is imported inside backfill_strava_dates, so matching
+never pays for stravalib.
+"""
 
 import json
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date as date_cls, timedelta
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 METERS_PER_MILE = 1609.344
+BACKFILL_BATCH_SIZE = 500
+_ONE_DAY = timedelta(days=1)
 
 
-def _load_orphaned_strava_sources(conn) -> list[dict]:
-    """Load all Strava activity_sources with activity_id IS NULL."""
-    rows = conn.execute(
-        """SELECT id, source_id, distance_mi, duration_s, workout_name, metadata_json,
-                  avg_pace_s_per_mi, avg_hr, max_hr, avg_cadence, total_ascent_ft, calories
-           FROM activity_sources
-           WHERE source = 'strava' AND activity_id IS NULL"""
-    ).fetchall()
+def _load_orphaned_strava_sources(conn, dates=None) -> list[dict]:
+    """Load Strava activity_sources with activity_id IS NULL.
+
+    With dates, only orphans whose start_date is one of them are read (and
+    JSON-parsed), via the generated start_date column and its index.
+    """
+    sql = """SELECT id, source_id, distance_mi, duration_s, workout_name, metadata_json,
+                    avg_pace_s_per_mi, avg_hr, max_hr, avg_cadence, total_ascent_ft, calories
+             FROM activity_sources
+             WHERE source = 'strava' AND activity_id IS NULL"""
+    if dates is None:
+        rows = conn.execute(sql + " ORDER BY id")
+    else:
+        # Sorted here rather than in SQL: ORDER BY id steers the planner onto
+        # the rowid-ordered source index instead of the start_date one
+        dates = tuple(dates)
+        sql += f" AND start_date IN ({','.join('?' * len(dates))})"
+        rows = sorted(conn.execute(sql, dates))
 
     sources = []
+    append = sources.append
     for r in rows:
-        meta = json.loads(r[5]) if r[5] else {}
-        sources.append({
+        meta = _loads(r[5]) if r[5] else {}
+        append({
             "id": r[0],
             "source_id": r[1],
             "distance_mi": r[2],
@@ -39,46 +63,150 @@ def _load_orphaned_strava_sources(conn) -> list[dict]:
     return sources
 
 
+def _nearby_dates(date: str) -> set[str]:
+    """The ISO date plus the day before and after."""
+    d = date_cls.fromisoformat(date)
+    return {date, (d - _ONE_DAY).isoformat(), (d + _ONE_DAY).isoformat()}
+
+
+def _loads(text: str):
+    """Parse JSON text, through orjson when it's installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _dumps(obj) -> str:
+    """Serialize to JSON text, through orjson when it's installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+class OrphanCache:
+    """Parsed orphans by start_date, shared by the matcher calls of one pass.
+
+    A reconcile pass creates one and passes it to each matcher call and to the
+    enricher. Each call asks for a ±1 day window; days not yet cached are
+    loaded with one indexed query. Cached days are dropped if the orphan set's
+    (db file, MAX(id), COUNT(*)) token changes. The enricher discard()s
+    orphans as it links them, so a run of successful matches doesn't force a
+    reload either. Orphan edits made outside the pass aren't seen, so don't
+    keep one beyond it. Day buckets
+    are tuples so a caller can't reorder or extend the shared snapshot;
+    day_totals holds each bucket's summed distance for the group matcher.
+    """
+
+    def __init__(self):
+        self._key = None
+        self.by_date: dict[str, tuple[dict, ...]] = {}
+        self.day_totals: dict[str, float | None] = {}
+
+    def for_dates(self, conn, dates) -> dict[str, tuple[dict, ...]]:
+        """Return {date: orphans} for the given dates, loading any missing days."""
+        key = self._token(conn)
+        if key != self._key:
+            self.invalidate()
+            self._key = key
+        if not key[2]:
+            return {}
+
+        missing = [d for d in dates if d not in self.by_date]
+        if missing:
+            loaded = {d: [] for d in missing}
+            for o in _load_orphaned_strava_sources(conn, missing):
+                loaded[o["start_date"]].append(o)
+            for d, group in loaded.items():
+                self._set_day(d, group)
+        return {d: self.by_date[d] for d in dates if self.by_date[d]}
+
+    def discard(self, conn, source_ids) -> None:
+        """Drop sources the caller just linked, keeping the cache valid."""
+        if self._key is None or self._key[0] != _db_file(conn):
+            return
+        source_ids = set(source_ids)
+        db, max_id, count = self._key
+        if max_id in source_ids:
+            # New MAX(id) is unknown without a query; just start over
+            self.invalidate()
+            return
+        for d, group in self.by_date.items():
+            if any(o["id"] in source_ids for o in group):
+                self._set_day(d, [o for o in group if o["id"] not in source_ids])
+        self._key = (db, max_id, count - len(source_ids))
+
+    def invalidate(self) -> None:
+        """Drop everything cached."""
+        self._key = None
+        self.by_date = {}
+        self.day_totals = {}
+
+    def _set_day(self, d, group) -> None:
+        self.by_date[d] = tuple(group)
+        self.day_totals[d] = _group_distance(group)
+
+    @staticmethod
+    def _token(conn) -> tuple:
+        max_id, count = conn.execute(
+            """SELECT MAX(id), COUNT(*) FROM activity_sources
+               WHERE source = 'strava' AND activity_id IS NULL"""
+        ).fetchone()
+        return (_db_file(conn), max_id, count)
+
+
+def _group_distance(group) -> float | None:
+    """Summed distance of a day's orphans, or None if any lacks a distance."""
+    if any(o["distance_mi"] is None or o["distance_mi"] <= 0 for o in group):
+        return None
+    return sum(o["distance_mi"] for o in group)
+
+
+def _db_file(conn) -> str:
+    """Path of the connection's main database ('' for in-memory)."""
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+
 def find_strava_match(conn, date: str, distance_mi: float,
-                      tolerance_pct: float = 5.0) -> dict | None:
+                      tolerance_pct: float = 5.0,
+                      orphans: OrphanCache | None = None) -> dict | None:
     """Find the best orphaned Strava source matching date ± 1 day and distance.
 
+    Pass the pass's OrphanCache as orphans to reuse loaded days across calls.
     Returns the matched orphan dict or None.
     """
-    orphans = _load_orphaned_strava_sources(conn)
-
-    if not orphans:
+    # Build candidate dates (±1 day)
+    candidate_dates = _nearby_dates(date)
+    if orphans is None:
+        orphans = OrphanCache()
+    by_date = orphans.for_dates(conn, candidate_dates)
+    if not by_date:
         return None
+    # Scan in id order, as a full-table scan would, so ties resolve the same way
+    candidates = sorted(
+        (o for group in by_date.values() for o in group),
+        key=lambda o: o["id"],
+    )
 
-    # Build candidate dates (±1 day)
-    dt = datetime.strptime(date, "%Y-%m-%d")
-    candidate_dates = {
-        date,
-        (dt - timedelta(days=1)).strftime("%Y-%m-%d"),
-        (dt + timedelta(days=1)).strftime("%Y-%m-%d"),
-    }
+    if distance_mi is None or distance_mi <= 0:
+        # Nothing to compare distances against: only a date-only match can win
+        for orphan in candidates:
+            orphan_dist = orphan["distance_mi"]
+            if (orphan_dist is None or orphan_dist <= 0) and orphan["start_date"] == date:
+                return orphan
+        return None
 
     best_match = None
     best_diff_pct = float("inf")
 
-    for orphan in orphans:
-        orphan_date = orphan["start_date"]
-        if not orphan_date:
-            continue
-        if orphan_date not in candidate_dates:
-            continue
-
+    for orphan in candidates:
         orphan_dist = orphan["distance_mi"]
         if orphan_dist is None or orphan_dist <= 0:
             # Date-only match (low confidence)
-            if orphan_date == date and best_match is None:
+            if orphan["start_date"] == date and best_match is None:
                 best_match = orphan
                 best_diff_pct = 100
             continue
 
-        if distance_mi is None or distance_mi <= 0:
-            continue
-
         diff_pct = abs(orphan_dist - distance_mi) / distance_mi * 100
         if diff_pct <= tolerance_pct and diff_pct < best_diff_pct:
             best_match = orphan
@@ -88,47 +216,39 @@ def find_strava_match(conn, date: str, distance_mi: float,
 
 
 def find_strava_group_match(conn, date: str, distance_mi: float,
-                            tolerance_pct: float = 10.0) -> list[dict] | None:
+                            tolerance_pct: float = 10.0,
+                            orphans: OrphanCache | None = None) -> list[dict] | None:
     """Find a group of same-day orphans whose summed distance matches.
 
     For multi-activity days (warm-up + main + cool-down), individual orphans
     won't match the XLSX total, but their sum may.
 
-    Returns the list of orphan dicts (sorted by start_time) if the sum matches,
-    or None if no group match.
+    orphans is the pass's OrphanCache, as for find_strava_match. Returns the
+    list of orphan dicts (sorted by start_time) if the sum matches, or None if
+    no group match.
     """
     if distance_mi is None or distance_mi <= 0:
         return None
 
-    orphans = _load_orphaned_strava_sources(conn)
-    if not orphans:
-        return None
-
     # Build candidate dates (±1 day) — same tolerance as 1:1 matcher
-    dt = datetime.strptime(date, "%Y-%m-%d")
-    candidate_dates = {
-        date,
-        (dt - timedelta(days=1)).strftime("%Y-%m-%d"),
-        (dt + timedelta(days=1)).strftime("%Y-%m-%d"),
-    }
-
-    # Filter to orphans within ±1 day, then group by actual date
-    nearby = [o for o in orphans if o["start_date"] in candidate_dates]
-    # Group by date — all orphans in a group must share the same day
-    from collections import defaultdict
-    by_date = defaultdict(list)
-    for o in nearby:
-        by_date[o["start_date"]].append(o)
+    candidate_dates = _nearby_dates(date)
 
-    # Try each candidate date's group
+    # Orphans within ±1 day, grouped by actual date — all orphans in a group
+    # must share the same day
+    if orphans is None:
+        orphans = OrphanCache()
+    by_date = orphans.for_dates(conn, candidate_dates)
+
+    # Try each candidate date's group, in order of each day's first orphan id
+    # (as a full-table scan would meet them) so ties resolve the same way
     best_group = None
     best_diff_pct = float("inf")
-    for d, group in by_date.items():
+    for d, group in sorted(by_date.items(), key=lambda item: item[1][0]["id"]):
         if len(group) < 2:
             continue
-        if any(o["distance_mi"] is None or o["distance_mi"] <= 0 for o in group):
+        total_dist = orphans.day_totals[d]
+        if total_dist is None:
             continue
-        total_dist = sum(o["distance_mi"] for o in group)
         diff_pct = abs(total_dist - distance_mi) / distance_mi * 100
         if diff_pct <= tolerance_pct and diff_pct < best_diff_pct:
             best_group = group
@@ -136,15 +256,13 @@ def find_strava_group_match(conn, date: str, distance_mi: float,
 
     if best_group is None:
         return None
-    same_day = best_group
 
     # Sort by start_time (metadata) so warm-up comes first
     def sort_key(o):
         st = o["metadata"].get("start_time", "")
         return st or ""
 
-    same_day.sort(key=sort_key)
-    return same_day
+    return sorted(best_group, key=sort_key)
 
 
 def find_promotable_orphans(conn, cutoff_date: str = "2025-12-01",
@@ -171,32 +289,25 @@ def find_promotable_orphans(conn, cutoff_date: str = "2025-12-01",
     if verbose:
         print(f"  Orphans after {cutoff_date}: {len(candidates)}")
 
-    # Exclude orphans that could match an existing activity
+    # Exclude orphans that could match an existing activity. Activity
+    # distances are read once, by date, rather than queried per orphan.
+    activity_dists = defaultdict(list)
+    for act_date, act_dist in conn.execute(
+        "SELECT date, distance_mi FROM activities WHERE distance_mi > 0"
+    ):
+        activity_dists[act_date].append(act_dist)
+
     promotable = []
     for orphan in candidates:
         orphan_date = orphan["start_date"]
-        dt = datetime.strptime(orphan_date, "%Y-%m-%d")
-        nearby_dates = {
-            orphan_date,
-            (dt - timedelta(days=1)).strftime("%Y-%m-%d"),
-            (dt + timedelta(days=1)).strftime("%Y-%m-%d"),
-        }
-        placeholders = ",".join("?" * len(nearby_dates))
+        nearby_dates = _nearby_dates(orphan_date)
 
         # Check if any existing activity is within ±1 day and 15% distance
-        rows = conn.execute(
-            f"""SELECT distance_mi FROM activities
-                WHERE date IN ({placeholders}) AND distance_mi IS NOT NULL""",
-            tuple(nearby_dates),
-        ).fetchall()
-
-        could_match = False
-        for (act_dist,) in rows:
-            if act_dist > 0:
-                diff_pct = abs(orphan["distance_mi"] - act_dist) / act_dist * 100
-                if diff_pct <= 15:
-                    could_match = True
-                    break
+        could_match = any(
+            abs(orphan["distance_mi"] - act_dist) / act_dist * 100 <= 15
+            for d in nearby_dates
+            for act_dist in activity_dists.get(d, ())
+        )
 
         if not could_match:
             promotable.append(orphan)
@@ -208,7 +319,6 @@ def find_promotable_orphans(conn, cutoff_date: str = "2025-12-01",
         print(f"  Promotable orphans: {len(promotable)}")
 
     # Group by start_date
-    from collections import defaultdict
     by_date = defaultdict(list)
     for o in promotable:
         by_date[o["start_date"]].append(o)
@@ -230,7 +340,7 @@ def backfill_strava_dates(config: dict, conn, verbose: bool = False) -> int:
     Returns count of sources updated.
     """
     from runbase.ingest.strava_sync import _get_client, _update_rate_limiter, \
-        StravaRateLimiter, RUNNING_TYPES, METERS_PER_MILE
+        _load_rate_limiter, _save_rate_limiter
 
     # Find orphans missing start_date
     rows = conn.execute(
@@ -242,7 +352,7 @@ def backfill_strava_dates(config: dict, conn, verbose: bool = False) -> int:
     # Build lookup: strava_id -> (row_id, metadata)
     needs_date = {}
     for r in rows:
-        meta = json.loads(r[2]) if r[2] else {}
+        meta = _loads(r[2]) if r[2] else {}
         if not meta.get("start_date"):
             needs_date[r[1]] = {"row_id": r[0], "metadata": meta}
 
@@ -255,8 +365,9 @@ def backfill_strava_dates(config: dict, conn, verbose: bool = False) -> int:
         print(f"Found {len(needs_date)} orphans missing start_date. Fetching from Strava API...")
 
     client = _get_client(config)
-    rate_limiter = StravaRateLimiter()
+    rate_limiter = _load_rate_limiter(conn)
     updated = 0
+    pending = []
 
     try:
         activities_iter = client.get_activities()
@@ -281,11 +392,10 @@ def backfill_strava_dates(config: dict, conn, verbose: bool = False) -> int:
             if hasattr(act, 'workout_type') and act.workout_type is not None:
                 meta["workout_type"] = int(act.workout_type)
 
-            conn.execute(
-                "UPDATE activity_sources SET metadata_json = ? WHERE id = ?",
-                (json.dumps(meta), entry["row_id"]),
-            )
+            pending.append((_dumps(meta), entry["row_id"]))
             updated += 1
+            if len(pending) >= BACKFILL_BATCH_SIZE:
+                _flush_metadata_updates(conn, pending)
 
             if verbose and updated % 50 == 0:
                 print(f"  ...updated {updated} so far")
@@ -294,7 +404,18 @@ def backfill_strava_dates(config: dict, conn, verbose: bool = False) -> int:
         if verbose:
             print(f"  Error fetching Strava activities: {e}")
 
-    conn.commit()
+    _flush_metadata_updates(conn, pending)
+    _save_rate_limiter(conn, rate_limiter)
     if verbose:
         print(f"Backfilled start_date for {updated} orphaned Strava sources.")
     return updated
+
+
+def _flush_metadata_updates(conn, pending: list[tuple]) -> None:
+    """Write queued (metadata_json, id) updates and commit."""
+    if pending:
+        conn.executemany(
+            "UPDATE activity_sources SET metadata_json = ? WHERE id = ?", pending
+        )
+        pending.clear()
+    conn.commit()
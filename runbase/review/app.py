@@ -1,217 +1,504 @@
+import json
 import sqlite3
 import subprocess
 import threading
-from calendar import monthrange
-from datetime import date, datetime, timedelta
+import time
+from calendar import isleap, monthrange
+from collections import deque
+from datetime import date, timedelta
+from functools import lru_cache
 from pathlib import Path
 
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, jsonify, render_template, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from runbase.config import load_config
-from runbase.db import get_connection, _migrate_schema
+from runbase.db import get_connection, get_db_path, _migrate_schema
+
+
+# ── Helpers ──────────────────────────────────────────────────────
+
+OVERRIDABLE_FIELDS = frozenset({
+    "distance_mi", "duration_s", "avg_pace_s_per_mi", "workout_name",
+    "workout_category", "shoe_id", "notes", "strides", "workout_type_zone",
+    "avg_hr", "max_hr", "avg_cadence",
+})
+
+# Override values are stored as text; numeric fields are converted back on
+# apply, everything else is used as-is
+OVERRIDE_COERCERS = {
+    "distance_mi": float, "duration_s": float, "avg_pace_s_per_mi": float,
+    "avg_hr": float, "max_hr": float, "avg_cadence": float,
+    "shoe_id": int, "strides": int,
+}
+
+# Overrides copied onto the activities row so they survive re-imports
+SYNC_FIELDS = frozenset({
+    "distance_mi", "duration_s", "avg_pace_s_per_mi",
+    "avg_hr", "max_hr", "avg_cadence",
+    "workout_name", "workout_category", "shoe_id", "strides", "notes",
+})
+FLOAT_SYNC_FIELDS = frozenset({"duration_s", "avg_pace_s_per_mi", "avg_hr", "max_hr", "avg_cadence"})
+INT_SYNC_FIELDS = frozenset({"shoe_id", "strides"})
+
+# Nullable numeric fields: an empty override value clears them to NULL
+NULLABLE_NUMERIC = frozenset({"avg_hr", "max_hr", "avg_cadence", "avg_pace_s_per_mi", "duration_s"})
+
+
+MONTH_NAMES = [
+    "", "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+]
+
+
+# Pre-rendered "m:ss" for every whole second under an hour, which covers
+# nearly all paces and most run durations
+_MMSS = [f"{m}:{s:02d}" for m in range(60) for s in range(60)]
+
+
+def _format_pace(seconds_per_mile):
+    if seconds_per_mile is None:
+        return ""
+    total = int(seconds_per_mile)
+    if 0 <= total < 3600:
+        return _MMSS[total]
+    m, s = divmod(total, 60)
+    return f"{m}:{s:02d}"
+
+
+def _format_duration(seconds):
+    if seconds is None:
+        return ""
+    total = int(seconds)
+    if 0 <= total < 3600:
+        return _MMSS[total]
+    return _format_long_duration(total)
+
+
+@lru_cache(maxsize=4096)
+def _format_long_duration(total):
+    """Duration text for whole seconds outside the _MMSS table (an hour or more)."""
+    if total >= 3600:
+        h, rem = divmod(total, 3600)
+        m, s = divmod(rem, 60)
+        return f"{h}:{m:02d}:{s:02d}"
+    m, s = divmod(total, 60)
+    return f"{m}:{s:02d}"
+
+
+def _format_duration_precise(seconds):
+    """Format duration with tenths of a second (for interval detail)."""
+    if seconds is None:
+        return ""
+    total = int(seconds)
+    return _format_tenths(total, round((seconds - total) * 10) % 10)
+
+
+@lru_cache(maxsize=4096)
+def _format_tenths(total, tenths):
+    """m:ss.t / h:mm:ss.t for whole seconds plus tenths."""
+    if total >= 3600:
+        h, rem = divmod(total, 3600)
+        m, s = divmod(rem, 60)
+        return f"{h}:{m:02d}:{s:02d}.{tenths}"
+    m, s = divmod(total, 60)
+    return f"{m}:{s:02d}.{tenths}"
+
+
+def _apply_overrides(activity_dict, overrides):
+    overridden = set()
+    for field_name, value in overrides.items():
+        if field_name in activity_dict or field_name in OVERRIDABLE_FIELDS:
+            overridden.add(field_name)
+            coerce = OVERRIDE_COERCERS.get(field_name)
+            activity_dict[field_name] = coerce(value) if coerce else value
+    return overridden
+
+
+def _get_overrides_for_activities(conn, activity_ids):
+    if not activity_ids:
+        return {}
+    # Ids go in as one JSON array so the SQL text (and its cached
+    # statement) is the same whatever the list length
+    rows = conn.execute(
+        "SELECT activity_id, field_name, override_value "
+        "FROM activity_overrides "
+        "WHERE activity_id IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(activity_ids)),),
+    ).fetchall()
+    result = {}
+    for r in rows:
+        result.setdefault(r["activity_id"], {})[r["field_name"]] = r["override_value"]
+    return result
+
+
+def _get_shoes(conn):
+    rows = conn.execute("SELECT id, name FROM shoes").fetchall()
+    return {r["id"]: r["name"] for r in rows}
+
+
+def _week_of_month(dt):
+    """1-based week number within the month (Sun-Sat weeks)."""
+    first = dt.replace(day=1)
+    # Sunday = 0 for week start: shift weekday so Sun=0
+    first_day_offset = (first.weekday() + 1) % 7  # Mon=0..Sun=6 → Sun=0..Sat=6
+    return ((dt.day - 1 + first_day_offset) // 7) + 1
+
+
+def _parse_iso_date(s):
+    """Parse a canonical YYYY-MM-DD string without going through strptime."""
+    return date(int(s[0:4]), int(s[5:7]), int(s[8:10]))
+
+
+@lru_cache(maxsize=8)
+def _year_days(year):
+    """(date, iso, day_of_week, date_short, week_of_month) for each day of a year, Jan 1 first."""
+    base = date(year, 1, 1)
+    days = []
+    for i in range(366 if isleap(year) else 365):
+        dt = base + timedelta(days=i)
+        days.append((dt, dt.isoformat(), dt.strftime("%a"), dt.strftime("%-m/%-d"),
+                     min(_week_of_month(dt), 5)))
+    return days
+
+
+@lru_cache(maxsize=8)
+def _day_labels(year):
+    """(day_of_week, date_short, week_of_month) for each (month, day) of a year."""
+    return {(dt.month, dt.day): (dow, short, wom)
+            for dt, _, dow, short, wom in _year_days(year)}
+
+
+@lru_cache(maxsize=8)
+def _elapsed_days(year, today):
+    """Days of each month (index 1-12) elapsed as of today: whole past months,
+    today's day of month for the current one, 0 for future months."""
+    elapsed = [0] * 13
+    for m in range(1, 13):
+        if year < today.year or (year == today.year and m < today.month):
+            elapsed[m] = monthrange(year, m)[1]
+        elif year == today.year and m == today.month:
+            elapsed[m] = today.day
+    return elapsed
+
+
+ZONE_PRIORITY = {"FR": 6, "R": 5, "I": 4, "T": 3, "M": 2, "E": 1}
+
+
+# Year view rows with everything _build_activity needs in one query:
+# overrides as a JSON object, whether GPS streams exist, and the
+# predominant pace zone across qualifying intervals
+INDEX_ACTIVITIES_SQL = f"""
+    SELECT a.*, s.name as shoe_name,
+           (SELECT json_group_object(o.field_name, o.override_value)
+            FROM activity_overrides o
+            WHERE o.activity_id = a.id) AS overrides_json,
+           EXISTS (SELECT 1 FROM streams st
+                   WHERE st.activity_id = a.id AND st.lat IS NOT NULL) AS stream_flag,
+           (SELECT i.pace_zone FROM intervals i
+            WHERE i.activity_id = a.id
+              AND i.pace_zone IN ({", ".join(f"'{z}'" for z in ZONE_PRIORITY)})
+              AND NOT i.is_recovery
+              AND NOT i.is_walking
+              AND (i.source IS NULL OR i.source != 'pace_segment')
+            ORDER BY CASE i.pace_zone
+                {" ".join(f"WHEN '{z}' THEN {p}" for z, p in ZONE_PRIORITY.items())}
+            END DESC
+            LIMIT 1) AS top_zone
+    FROM activities a
+    LEFT JOIN shoes s ON a.shoe_id = s.id
+    WHERE a.date BETWEEN ? AND ?
+    ORDER BY a.date ASC, a.start_time ASC, a.id ASC"""
+
+
+def _build_activity(r, shoes):
+    """Format a row from INDEX_ACTIVITIES_SQL for display."""
+    a = dict(r)
+    ovr = json.loads(a.pop("overrides_json"))
+    has_streams = bool(a.pop("stream_flag"))
+    zone = a.pop("top_zone") or ""
+    overridden = _apply_overrides(a, ovr)
+
+    display_dist = a.get("adjusted_distance_mi") or a.get("distance_mi")
+    a["display_distance"] = f"{display_dist:.2f}" if display_dist else ""
+    a["display_duration"] = _format_duration(a.get("duration_s"))
+    a["display_pace"] = _format_pace(a.get("avg_pace_s_per_mi"))
+    a["display_hr"] = f"{a['avg_hr']:.0f}" if a.get("avg_hr") else ""
+    a["display_cadence"] = f"{a['avg_cadence']:.0f}" if a.get("avg_cadence") else ""
+    a["shoe_name"] = shoes.get(a.get("shoe_id"), "")
+    a["has_streams"] = has_streams
+    a["overridden_fields"] = list(overridden)
+    a["workout_type_zone"] = ovr.get("workout_type_zone", zone)
+
+    dt = _parse_iso_date(a["date"])
+    a["day_of_week"], a["date_short"], a["week_of_month"] = _day_labels(dt.year)[dt.month, dt.day]
+    a["month_num"] = dt.month
+
+    return a
+
+
+def _merge_day(day_acts):
+    """Merge multiple activities on the same day into one summary row.
+
+    Distance/duration/strides are summed. Pace/HR/cadence/shoe/name/notes/vdot
+    come from the primary (largest distance) activity. All activity IDs are
+    kept for detail expansion.
+    """
+    if len(day_acts) == 1:
+        # Nothing to sum; the built dict isn't shared with anything that
+        # reads activity_ids, so annotate it in place instead of copying
+        a = day_acts[0]
+        a["activity_ids"] = [a["id"]]
+        return a
+
+    # Primary = largest distance
+    primary = max(day_acts, key=lambda a: (a.get("adjusted_distance_mi") or a.get("distance_mi") or 0))
+    merged = primary.copy()
+    merged["activity_ids"] = [a["id"] for a in day_acts]
+
+    total_dist = sum((a.get("adjusted_distance_mi") or a.get("distance_mi") or 0) for a in day_acts)
+    total_dur = sum((a.get("duration_s") or 0) for a in day_acts)
+    total_strides = sum((a.get("strides") or 0) for a in day_acts)
+
+    merged["adjusted_distance_mi"] = total_dist
+    merged["distance_mi"] = total_dist
+    merged["duration_s"] = total_dur
+    merged["display_distance"] = f"{total_dist:.2f}" if total_dist else ""
+    merged["display_duration"] = _format_duration(total_dur) if total_dur else ""
+    merged["strides"] = total_strides or None
+    # Keep primary's pace/HR/cadence/shoe/name/vdot
+    merged["has_streams"] = any(a["has_streams"] for a in day_acts)
+    merged["overridden_fields"] = list(set().union(*(a["overridden_fields"] for a in day_acts)))
+
+    # Pick highest-priority workout type zone across all activities
+    best_zone = ""
+    for a in day_acts:
+        z = a.get("workout_type_zone", "")
+        if ZONE_PRIORITY.get(z, 0) > ZONE_PRIORITY.get(best_zone, 0):
+            best_zone = z
+    merged["workout_type_zone"] = best_zone
+
+    # Collect names if multiple
+    names = [a.get("workout_name") or "" for a in day_acts if a.get("workout_name")]
+    if len(names) > 1:
+        merged["workout_name"] = " + ".join(names)
+
+    return merged
+
+
+def _downsample(points, target):
+    """Evenly spaced subset of target points (all of them if fewer)."""
+    n = len(points)
+    if n <= target:
+        return points
+    return [points[k * n // target] for k in range(target)]
+
+
+def _json_response(obj):
+    """JSON response, encoded through orjson when it's installed."""
+    if orjson is not None:
+        return Response(orjson.dumps(obj), mimetype="application/json")
+    return jsonify(obj)
+
+
+def _format_interval(r):
+    iv = dict(r)
+    dist = iv.get("canonical_distance_mi") or iv.get("gps_measured_distance_mi") or iv.get("prescribed_distance_mi")
+    if dist and dist < 1.0:
+        iv["display_distance"] = f"{dist * 1609.344:.0f}m"
+    elif dist:
+        iv["display_distance"] = f"{dist:.2f}mi"
+    else:
+        iv["display_distance"] = ""
+    iv["display_duration"] = _format_duration_precise(iv.get("duration_s"))
+    iv["display_pace"] = _format_pace(iv.get("avg_pace_s_per_mi"))
+    iv["display_hr"] = f"{iv['avg_hr']:.0f}" if iv.get("avg_hr") else ""
+    iv["display_cadence"] = f"{iv['avg_cadence']:.0f}" if iv.get("avg_cadence") else ""
+    return iv
+
+
+def _build_rep_summary(all_intervals):
+    """Group intervals by rep distance and compute averages."""
+    # Single pass: each bucket keeps its rep count and the present values
+    buckets = {}
+    for iv in all_intervals:
+        if iv.get("is_walking") or iv.get("is_recovery"):
+            continue
+        dist = iv.get("canonical_distance_mi") or iv.get("gps_measured_distance_mi") or iv.get("prescribed_distance_mi")
+        if not dist or dist <= 0:
+            continue
+        # Round to nearest bucket for grouping
+        if dist < 1.0:
+            key_m = round(dist * 1609.344 / 50) * 50  # nearest 50m
+            label = f"{key_m:.0f}m"
+        else:
+            key_m = round(dist, 2)
+            label = f"{key_m:.2f}mi"
+        bucket = buckets.get(label)
+        if bucket is None:
+            bucket = buckets[label] = {"count": 0, "durations": [], "paces": [], "hrs": []}
+        bucket["count"] += 1
+        if iv.get("duration_s"):
+            bucket["durations"].append(iv["duration_s"])
+        if iv.get("avg_pace_s_per_mi"):
+            bucket["paces"].append(iv["avg_pace_s_per_mi"])
+        if iv.get("avg_hr"):
+            bucket["hrs"].append(iv["avg_hr"])
+
+    summary = []
+    for label, bucket in buckets.items():
+        if bucket["count"] < 2:
+            continue
+        durations, paces, hrs = bucket["durations"], bucket["paces"], bucket["hrs"]
+        summary.append({
+            "distance": label,
+            "count": bucket["count"],
+            "avg_duration": _format_duration_precise(sum(durations) / len(durations)) if durations else "",
+            "avg_pace": _format_pace(sum(paces) / len(paces)) if paces else "",
+            "avg_hr": f"{sum(hrs) / len(hrs):.0f}" if hrs else "",
+        })
+    return summary
+
+
+INTERVAL_EDITABLE = frozenset({"distance", "duration_s", "avg_hr", "pace_zone"})
+
+# Import pipeline subprocess: wall-clock limit and how many trailing output
+# lines the status endpoint keeps
+IMPORT_TIMEOUT_S = 300
+IMPORT_OUTPUT_LINES = 2000
+
+STATIC_DIR = Path(__file__).parent / "static"
+# Static files are rescanned when the directory changes (files added,
+# removed or replaced) and at least this often, to catch in-place edits
+CACHE_BUST_TTL_S = 10
+_cache_bust_state = {"key": None, "value": 0}
+
+
+def _cache_bust():
+    """Cache bust key for static assets: max mtime of the static files."""
+    key = (STATIC_DIR.stat().st_mtime_ns, int(time.monotonic() // CACHE_BUST_TTL_S))
+    if key != _cache_bust_state["key"]:
+        _cache_bust_state["value"] = int(max(f.stat().st_mtime for f in STATIC_DIR.iterdir() if f.is_file()))
+        _cache_bust_state["key"] = key
+    return _cache_bust_state["value"]
+
+
+# Idle connections each app keeps for reuse between requests
+DB_POOL_SIZE = 4
+
+
+class _PooledConnection(sqlite3.Connection):
+    """Connection whose close() returns it to its app's idle pool.
+
+    Reuse keeps the prepared-statement cache warm and skips the connect-time
+    PRAGMAs. Uncommitted work is rolled back on the way in, as a real close
+    would discard it; connections beyond DB_POOL_SIZE are closed for real.
+    """
+
+    pool = None
+
+    def close(self):
+        if self.pool is None:
+            return super().close()
+        idle, lock = self.pool
+        if self.in_transaction:
+            self.rollback()
+        with lock:
+            if len(idle) < DB_POOL_SIZE:
+                idle.append(self)
+                return None
+        return super().close()
 
 
 def create_app(config=None):
     app = Flask(
         __name__,
         template_folder=str(Path(__file__).parent / "templates"),
-        static_folder=str(Path(__file__).parent / "static"),
+        static_folder=str(STATIC_DIR),
     )
 
     if config is None:
         config = load_config()
     app.config["RUNBASE"] = config
 
+    # Schema migrations only need to run on the first connection
+    _schema_ready = {"done": False}
+
+    # Connections are shared across request threads, one at a time
+    _idle_conns = []
+    _pool_lock = threading.Lock()
+
     def get_db():
-        conn = get_connection(config)
+        with _pool_lock:
+            if _idle_conns:
+                return _idle_conns.pop()
+        conn = get_connection(config, factory=_PooledConnection, check_same_thread=False)
         conn.row_factory = sqlite3.Row
-        _migrate_schema(conn)
+        conn.pool = (_idle_conns, _pool_lock)
+        if not _schema_ready["done"]:
+            _migrate_schema(conn)
+            _schema_ready["done"] = True
         return conn
 
-    # ── Helpers ──────────────────────────────────────────────────────
-
-    OVERRIDABLE_FIELDS = {
-        "distance_mi", "duration_s", "avg_pace_s_per_mi", "workout_name",
-        "workout_category", "shoe_id", "notes", "strides", "workout_type_zone",
-        "avg_hr", "max_hr", "avg_cadence",
-    }
-
-    MONTH_NAMES = [
-        "", "January", "February", "March", "April", "May", "June",
-        "July", "August", "September", "October", "November", "December",
-    ]
-
-    def _format_pace(seconds_per_mile):
-        if seconds_per_mile is None:
-            return ""
-        m, s = divmod(int(seconds_per_mile), 60)
-        return f"{m}:{s:02d}"
-
-    def _format_duration(seconds):
-        if seconds is None:
-            return ""
-        total = int(seconds)
-        if total >= 3600:
-            h, rem = divmod(total, 3600)
-            m, s = divmod(rem, 60)
-            return f"{h}:{m:02d}:{s:02d}"
-        m, s = divmod(total, 60)
-        return f"{m}:{s:02d}"
-
-    def _format_duration_precise(seconds):
-        """Format duration with tenths of a second (for interval detail)."""
-        if seconds is None:
-            return ""
-        total = int(seconds)
-        tenths = round((seconds - total) * 10) % 10
-        if total >= 3600:
-            h, rem = divmod(total, 3600)
-            m, s = divmod(rem, 60)
-            return f"{h}:{m:02d}:{s:02d}.{tenths}"
-        m, s = divmod(total, 60)
-        return f"{m}:{s:02d}.{tenths}"
-
-    def _apply_overrides(activity_dict, overrides):
-        overridden = set()
-        for field_name, value in overrides.items():
-            if field_name in activity_dict or field_name in OVERRIDABLE_FIELDS:
-                overridden.add(field_name)
-                if field_name in ("distance_mi", "duration_s", "avg_pace_s_per_mi",
-                                  "avg_hr", "max_hr", "avg_cadence"):
-                    activity_dict[field_name] = float(value)
-                elif field_name in ("shoe_id", "strides"):
-                    activity_dict[field_name] = int(value)
-                else:
-                    activity_dict[field_name] = value
-        return overridden
-
-    def _get_overrides_for_activities(conn, activity_ids):
-        if not activity_ids:
-            return {}
-        placeholders = ",".join("?" * len(activity_ids))
-        rows = conn.execute(
-            f"SELECT activity_id, field_name, override_value "
-            f"FROM activity_overrides WHERE activity_id IN ({placeholders})",
-            activity_ids,
-        ).fetchall()
-        result = {}
-        for r in rows:
-            result.setdefault(r["activity_id"], {})[r["field_name"]] = r["override_value"]
-        return result
-
-    def _get_shoes(conn):
-        rows = conn.execute("SELECT id, name FROM shoes").fetchall()
-        return {r["id"]: r["name"] for r in rows}
-
-    def _week_of_month(dt):
-        """1-based week number within the month (Sun-Sat weeks)."""
-        first = dt.replace(day=1)
-        # Sunday = 0 for week start: shift weekday so Sun=0
-        first_day_offset = (first.weekday() + 1) % 7  # Mon=0..Sun=6 → Sun=0..Sat=6
-        return ((dt.day - 1 + first_day_offset) // 7) + 1
-
-    ZONE_PRIORITY = {"FR": 6, "R": 5, "I": 4, "T": 3, "M": 2, "E": 1}
-
-    def _get_workout_types(conn, activity_ids):
-        """Get predominant pace zone per activity from qualifying intervals."""
-        if not activity_ids:
-            return {}
-        placeholders = ",".join("?" * len(activity_ids))
-        rows = conn.execute(
-            f"""SELECT activity_id, pace_zone
-                FROM intervals
-                WHERE activity_id IN ({placeholders})
-                  AND pace_zone IS NOT NULL
-                  AND NOT is_recovery
-                  AND NOT is_walking
-                  AND (source IS NULL OR source != 'pace_segment')""",
-            activity_ids,
-        ).fetchall()
-        # Pick highest-priority zone per activity
-        result = {}
-        for r in rows:
-            aid = r["activity_id"]
-            zone = r["pace_zone"]
-            prio = ZONE_PRIORITY.get(zone, 0)
-            if prio > ZONE_PRIORITY.get(result.get(aid, ""), 0):
-                result[aid] = zone
-        return result
-
-    def _build_activity(r, overrides_map, shoes, has_streams_set, workout_types):
-        a = dict(r)
-        ovr = overrides_map.get(a["id"], {})
-        overridden = _apply_overrides(a, ovr)
-
-        display_dist = a.get("adjusted_distance_mi") or a.get("distance_mi")
-        a["display_distance"] = f"{display_dist:.2f}" if display_dist else ""
-        a["display_duration"] = _format_duration(a.get("duration_s"))
-        a["display_pace"] = _format_pace(a.get("avg_pace_s_per_mi"))
-        a["display_hr"] = f"{a['avg_hr']:.0f}" if a.get("avg_hr") else ""
-        a["display_cadence"] = f"{a['avg_cadence']:.0f}" if a.get("avg_cadence") else ""
-        a["shoe_name"] = shoes.get(a.get("shoe_id"), "")
-        a["has_streams"] = a["id"] in has_streams_set
-        a["overridden_fields"] = list(overridden)
-        a["workout_type_zone"] = ovr.get("workout_type_zone", workout_types.get(a["id"], ""))
-
-        dt = datetime.strptime(a["date"], "%Y-%m-%d")
-        a["day_of_week"] = dt.strftime("%a")
-        a["date_short"] = dt.strftime("%-m/%-d")
-        a["month_num"] = dt.month
-        a["week_of_month"] = min(_week_of_month(dt), 5)
+    # Rendered index pages by year, reused while the data version is unchanged
+    _index_cache = {}
+    _write_count = {"n": 0}
 
-        return a
+    @app.after_request
+    def _count_writes(response):
+        if request.method != "GET":
+            _write_count["n"] += 1
+        return response
 
-    def _merge_day(day_acts):
-        """Merge multiple activities on the same day into one summary row.
-
-        Distance/duration/strides are summed. Pace/HR/cadence/shoe/name/notes/vdot
-        come from the primary (largest distance) activity. All activity IDs are
-        kept for detail expansion.
-        """
-        if len(day_acts) == 1:
-            a = day_acts[0].copy()
-            a["activity_ids"] = [a["id"]]
-            return a
-
-        # Primary = largest distance
-        primary = max(day_acts, key=lambda a: (a.get("adjusted_distance_mi") or a.get("distance_mi") or 0))
-        merged = primary.copy()
-        merged["activity_ids"] = [a["id"] for a in day_acts]
-
-        total_dist = sum((a.get("adjusted_distance_mi") or a.get("distance_mi") or 0) for a in day_acts)
-        total_dur = sum((a.get("duration_s") or 0) for a in day_acts)
-        total_strides = sum((a.get("strides") or 0) for a in day_acts)
-
-        merged["adjusted_distance_mi"] = total_dist
-        merged["distance_mi"] = total_dist
-        merged["duration_s"] = total_dur
-        merged["display_distance"] = f"{total_dist:.2f}" if total_dist else ""
-        merged["display_duration"] = _format_duration(total_dur) if total_dur else ""
-        merged["strides"] = total_strides or None
-        # Keep primary's pace/HR/cadence/shoe/name/vdot
-        merged["has_streams"] = any(a["has_streams"] for a in day_acts)
-        merged["overridden_fields"] = list(set().union(*(a["overridden_fields"] for a in day_acts)))
-
-        # Pick highest-priority workout type zone across all activities
-        best_zone = ""
-        for a in day_acts:
-            z = a.get("workout_type_zone", "")
-            if ZONE_PRIORITY.get(z, 0) > ZONE_PRIORITY.get(best_zone, 0):
-                best_zone = z
-        merged["workout_type_zone"] = best_zone
-
-        # Collect names if multiple
-        names = [a.get("workout_name") or "" for a in day_acts if a.get("workout_name")]
-        if len(names) > 1:
-            merged["workout_name"] = " + ".join(names)
-
-        return merged
+    def _data_version():
+        """Changes on any write: ours via the counter, other processes' (the
+        import pipeline, CLI) via the db and WAL file mtime/size."""
+        db_path = get_db_path(config)
+        stats = []
+        for p in (db_path, db_path.with_name(db_path.name + "-wal")):
+            try:
+                st = p.stat()
+                stats.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stats.append(None)
+        return (_write_count["n"], *stats)
+
+    # Shoe names by id, shared across index renders until the data changes
+    _shoes_cache = {"version": None, "shoes": {}}
+
+    def get_shoes(conn, data_version):
+        if _shoes_cache["version"] != data_version:
+            _shoes_cache["shoes"] = _get_shoes(conn)
+            _shoes_cache["version"] = data_version
+        return _shoes_cache["shoes"]
+
+    # Stats API payloads by request key, reused while the data version is
+    # unchanged; bounded, dropping the least-used entry when full
+    STATS_CACHE_SIZE = 4
+    _footer_cache = {}
+    _seven_day_cache = {}
+
+    def _cached_stats(cache, key, version):
+        entry = cache.get(key)
+        if entry and entry[0] == version:
+            entry[2] += 1
+            return entry[1]
+        return None
+
+    def _store_stats(cache, key, version, payload):
+        if key not in cache and len(cache) >= STATS_CACHE_SIZE:
+            del cache[min(cache, key=lambda k: cache[k][2])]
+        cache[key] = [version, payload, 0]
 
     # ── Jinja2 Filters ─────────────────────────────────────────────
 
     @app.template_filter("parse_date")
     def _filter_parse_date(value):
-        return datetime.strptime(value, "%Y-%m-%d")
+        return _parse_iso_date(value)
 
     @app.template_filter("monday_of_week")
     def _filter_monday_of_week(dt):
@@ -222,120 +509,108 @@ def create_app(config=None):
     @app.route("/")
     def index():
         year = request.args.get("year", type=int, default=date.today().year)
-        conn = get_db()
         today = date.today()
 
+        cache_bust = _cache_bust()
+
+        data_version = _data_version()
+        version = (today, cache_bust, data_version)
+        cached = _index_cache.get(year)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        conn = get_db()
+
         start = f"{year}-01-01"
         end = f"{year}-12-31"
 
         # Fetch prior year's last 6 days for 7d MA at start of year
         prior_start = f"{year - 1}-12-25"
-        prior_rows = conn.execute(
+        # Daily distances as a dense list from Dec 26 of the prior year, so
+        # each day's 7-day window is a slice; activities are bucketed by the
+        # same day slot
+        window_start = date(year, 1, 1) - timedelta(days=6)
+        base = window_start.toordinal()
+        daily = [0] * ((date(year, 12, 31) - window_start).days + 1)
+        acts_by_day = [[] for _ in daily]
+        for d, dist in conn.execute(
             """SELECT date, COALESCE(adjusted_distance_mi, distance_mi, 0) as dist
                FROM activities
                WHERE date BETWEEN ? AND ?""",
             (prior_start, f"{year - 1}-12-31"),
-        ).fetchall()
-        daily_dist = {}
-        for r in prior_rows:
-            daily_dist[r["date"]] = daily_dist.get(r["date"], 0) + r["dist"]
-
-        rows = conn.execute(
-            """SELECT a.*, s.name as shoe_name
-               FROM activities a
-               LEFT JOIN shoes s ON a.shoe_id = s.id
-               WHERE a.date BETWEEN ? AND ?
-               ORDER BY a.date ASC, a.start_time ASC""",
-            (start, end),
-        ).fetchall()
-
-        activity_ids = [r["id"] for r in rows]
-        overrides_map = _get_overrides_for_activities(conn, activity_ids)
-        shoes = _get_shoes(conn)
-
-        has_streams = set()
-        if activity_ids:
-            ph = ",".join("?" * len(activity_ids))
-            stream_rows = conn.execute(
-                f"SELECT DISTINCT activity_id FROM streams "
-                f"WHERE activity_id IN ({ph}) AND lat IS NOT NULL",
-                activity_ids,
-            ).fetchall()
-            has_streams = {r["activity_id"] for r in stream_rows}
+        ):
+            k = _parse_iso_date(d).toordinal() - base
+            if k >= 0:
+                daily[k] += dist
 
-        workout_types = _get_workout_types(conn, activity_ids)
+        shoes = get_shoes(conn, data_version)
 
         # Fetch planned activities for the year (used in blank calendar rows + 7d MA)
-        planned_rows = conn.execute(
+        planned_map = {r["date"]: dict(r) for r in conn.execute(
             "SELECT date, distance_mi, workout_name FROM planned_activities "
             "WHERE date BETWEEN ? AND ?",
             (start, end),
-        ).fetchall()
-        planned_map = {r["date"]: dict(r) for r in planned_rows}
+        )}
 
-        # Build activities grouped by date
+        # Build activities grouped by day, straight off the cursor
         activities = []
         months_with_data = set()
-        by_date = {}
-        for r in rows:
-            a = _build_activity(r, overrides_map, shoes, has_streams, workout_types)
+        for r in conn.execute(INDEX_ACTIVITIES_SQL, (start, end)):
+            a = _build_activity(r, shoes)
             activities.append(a)
             months_with_data.add(a["month_num"])
-            by_date.setdefault(a["date"], []).append(a)
+            k = _parse_iso_date(a["date"]).toordinal() - base
+            acts_by_day[k].append(a)
             # Accumulate daily distances for 7d MA
-            dist = a.get("adjusted_distance_mi") or a.get("distance_mi") or 0
-            daily_dist[a["date"]] = daily_dist.get(a["date"], 0) + dist
+            daily[k] += a.get("adjusted_distance_mi") or a.get("distance_mi") or 0
 
-        # Add planned distances to daily_dist for 7d MA (only for dates without real activities)
+        # Add planned distances for 7d MA (only for dates without real activities)
         for p_date, p_data in planned_map.items():
-            if p_date not in by_date and p_data.get("distance_mi"):
-                daily_dist[p_date] = daily_dist.get(p_date, 0) + p_data["distance_mi"]
+            k = _parse_iso_date(p_date).toordinal() - base
+            if not acts_by_day[k] and p_data.get("distance_mi"):
+                daily[k] += p_data["distance_mi"]
 
         # Build full calendar: one row per day (merged if multiple activities)
-        month_calendars = {}
-        for m in range(1, 13):
-            days_in_month = monthrange(year, m)[1]
-            cal = []
-            for d in range(1, days_in_month + 1):
-                dt = date(year, m, d)
-                date_str = dt.isoformat()
-                day_acts = by_date.get(date_str, [])
-                wom = min(_week_of_month(datetime(year, m, d)), 5)
-
-                # 7-day trailing mileage sum
-                seven_day = 0.0
-                for offset in range(7):
-                    dd = dt - timedelta(days=offset)
-                    seven_day += daily_dist.get(dd.isoformat(), 0)
-                is_saturday = dt.weekday() == 5  # Saturday
-                ma_display = f"{seven_day:.1f}"
-
-                if day_acts:
-                    merged = _merge_day(day_acts)
-                    merged["week_of_month"] = wom
-                    merged["seven_day_ma"] = ma_display
-                    merged["is_saturday"] = is_saturday
-                    cal.append({"blank": False, "activity": merged})
-                else:
-                    planned = planned_map.get(date_str)
-                    cal.append({
-                        "blank": True,
-                        "date_str": date_str,
-                        "day_of_week": dt.strftime("%a"),
-                        "date_short": dt.strftime("%-m/%-d"),
-                        "month_num": m,
-                        "week_of_month": wom,
-                        "seven_day_ma": ma_display,
-                        "is_saturday": is_saturday,
-                        "planned": planned,
-                        "is_future": dt >= today,
-                    })
-            month_calendars[m] = cal
+        month_calendars = {m: [] for m in range(1, 13)}
+        month_acts_by_month = {m: [] for m in range(1, 13)}
+        # Jan 1 sits at slot 6 of daily
+        for day_idx, (dt, date_str, day_of_week, date_short, wom) in enumerate(_year_days(year), start=6):
+            m = dt.month
+            day_acts = acts_by_day[day_idx]
+
+            # 7-day trailing mileage sum (same-day first, as before)
+            seven_day = 0.0
+            for dist in reversed(daily[day_idx - 6:day_idx + 1]):
+                seven_day += dist
+            is_saturday = dt.weekday() == 5  # Saturday
+            ma_display = f"{seven_day:.1f}"
+
+            if day_acts:
+                merged = _merge_day(day_acts)
+                merged["week_of_month"] = wom
+                merged["seven_day_ma"] = ma_display
+                merged["is_saturday"] = is_saturday
+                month_calendars[m].append({"blank": False, "activity": merged})
+                month_acts_by_month[m].append(merged)
+            else:
+                planned = planned_map.get(date_str)
+                month_calendars[m].append({
+                    "blank": True,
+                    "date_str": date_str,
+                    "day_of_week": day_of_week,
+                    "date_short": date_short,
+                    "month_num": m,
+                    "week_of_month": wom,
+                    "seven_day_ma": ma_display,
+                    "is_saturday": is_saturday,
+                    "planned": planned,
+                    "is_future": dt >= today,
+                })
 
         # Weekly aggregates (keyed by Sunday start)
         weeks = {}
         for a in activities:
-            dt = datetime.strptime(a["date"], "%Y-%m-%d")
+            dt = _parse_iso_date(a["date"])
             # Sunday-start week: shift so Sunday=0
             days_since_sunday = (dt.weekday() + 1) % 7
             sunday = dt - timedelta(days=days_since_sunday)
@@ -365,25 +640,17 @@ def create_app(config=None):
         longest_run = 0.0
         max_week_dist = 0.0
 
+        elapsed_by_month = _elapsed_days(year, today)
         for m in range(1, 13):
-            month_acts = [day["activity"] for day in month_calendars.get(m, []) if not day["blank"]]
-            dist = sum((a.get("adjusted_distance_mi") or a.get("distance_mi") or 0) for a in month_acts)
+            month_acts = month_acts_by_month[m]
+            month_dists = [(a.get("adjusted_distance_mi") or a.get("distance_mi") or 0) for a in month_acts]
+            dist = sum(month_dists)
             dur = sum((a.get("duration_s") or 0) for a in month_acts)
             count = len(month_acts)
             avg_pace = (dur / dist) if dist > 0 else None
 
             # Average weekly mileage: total miles / number of weeks elapsed
-            days_in_m = monthrange(year, m)[1]
-            if year == today.year and m == today.month:
-                # Current month: count days through today (or yesterday if no run today)
-                effective_day = today.day
-                elapsed_days = effective_day
-            elif year < today.year or (year == today.year and m < today.month):
-                # Past month: full month
-                elapsed_days = days_in_m
-            else:
-                # Future month
-                elapsed_days = 0
+            elapsed_days = elapsed_by_month[m]
             elapsed_weeks = elapsed_days / 7.0 if elapsed_days > 0 else 0
             avg_weekly = (dist / elapsed_weeks) if elapsed_weeks > 0 else 0
 
@@ -402,10 +669,7 @@ def create_app(config=None):
             yearly_distance += dist
             yearly_duration += dur
             yearly_count += count
-            for a in month_acts:
-                d = a.get("adjusted_distance_mi") or a.get("distance_mi") or 0
-                if d > longest_run:
-                    longest_run = d
+            longest_run = max([longest_run, *month_dists])
 
         for w in sorted_weeks:
             if w["distance"] > max_week_dist:
@@ -417,16 +681,15 @@ def create_app(config=None):
         # ── Weekly mileage chart data (prior 6 months) ──────────────
         chart_start = (today - timedelta(days=180)).isoformat()
         chart_end = today.isoformat()
-        chart_rows = conn.execute(
+        # Build weekly buckets (Sun-Sat, keyed by Saturday end date)
+        chart_daily = {}
+        for d, dist in conn.execute(
             """SELECT date, COALESCE(adjusted_distance_mi, distance_mi, 0) as dist
                FROM activities
                WHERE date BETWEEN ? AND ?""",
             (chart_start, chart_end),
-        ).fetchall()
-        # Build weekly buckets (Sun-Sat, keyed by Saturday end date)
-        chart_daily = {}
-        for r in chart_rows:
-            chart_daily[r["date"]] = chart_daily.get(r["date"], 0) + r["dist"]
+        ):
+            chart_daily[d] = chart_daily.get(d, 0) + dist
 
         # Generate all Saturdays in the range
         weekly_chart_data = []
@@ -446,20 +709,18 @@ def create_app(config=None):
             })
             sat += timedelta(days=7)
 
-        # Year range for calendar
+        # Year range for calendar. Separate MIN/MAX subqueries so each is a
+        # single seek on the date index rather than a scan
         year_range_row = conn.execute(
-            "SELECT MIN(substr(date,1,4)) as min_y, MAX(substr(date,1,4)) as max_y FROM activities"
+            "SELECT (SELECT MIN(date) FROM activities) as min_d, "
+            "(SELECT MAX(date) FROM activities) as max_d"
         ).fetchone()
-        min_year = int(year_range_row["min_y"]) if year_range_row["min_y"] else year
-        max_year = int(year_range_row["max_y"]) if year_range_row["max_y"] else year
+        min_year = int(year_range_row["min_d"][:4]) if year_range_row["min_d"] else year
+        max_year = int(year_range_row["max_d"][:4]) if year_range_row["max_d"] else year
 
         conn.close()
 
-        # Cache bust key: max mtime of static files
-        static_dir = Path(__file__).parent / "static"
-        cache_bust = int(max(f.stat().st_mtime for f in static_dir.iterdir() if f.is_file()))
-
-        return render_template(
+        html = render_template(
             "index.html",
             activities=activities,
             month_calendars=month_calendars,
@@ -482,6 +743,8 @@ def create_app(config=None):
             weekly_chart_data=weekly_chart_data,
             cache_bust=cache_bust,
         )
+        _index_cache[year] = (version, html)
+        return html
 
     @app.route("/api/activities")
     def api_activities():
@@ -495,28 +758,13 @@ def create_app(config=None):
                FROM activities a
                LEFT JOIN shoes s ON a.shoe_id = s.id
                WHERE a.date BETWEEN ? AND ?
-               ORDER BY a.date ASC""",
+               ORDER BY a.date ASC, a.id ASC""",
             (start, end),
         ).fetchall()
         result = [dict(r) for r in rows]
         conn.close()
         return jsonify(result)
 
-    def _format_interval(r):
-        iv = dict(r)
-        dist = iv.get("canonical_distance_mi") or iv.get("gps_measured_distance_mi") or iv.get("prescribed_distance_mi")
-        if dist and dist < 1.0:
-            iv["display_distance"] = f"{dist * 1609.344:.0f}m"
-        elif dist:
-            iv["display_distance"] = f"{dist:.2f}mi"
-        else:
-            iv["display_distance"] = ""
-        iv["display_duration"] = _format_duration_precise(iv.get("duration_s"))
-        iv["display_pace"] = _format_pace(iv.get("avg_pace_s_per_mi"))
-        iv["display_hr"] = f"{iv['avg_hr']:.0f}" if iv.get("avg_hr") else ""
-        iv["display_cadence"] = f"{iv['avg_cadence']:.0f}" if iv.get("avg_cadence") else ""
-        return iv
-
     @app.route("/api/activity/<int:activity_id>/intervals")
     def api_intervals(activity_id):
         conn = get_db()
@@ -542,41 +790,6 @@ def create_app(config=None):
         conn.close()
         return jsonify({"intervals": intervals, "laps": laps, "summary": summary})
 
-    def _build_rep_summary(all_intervals):
-        """Group intervals by rep distance and compute averages."""
-        from collections import defaultdict
-        buckets = defaultdict(list)
-        for iv in all_intervals:
-            if iv.get("is_walking") or iv.get("is_recovery"):
-                continue
-            dist = iv.get("canonical_distance_mi") or iv.get("gps_measured_distance_mi") or iv.get("prescribed_distance_mi")
-            if not dist or dist <= 0:
-                continue
-            # Round to nearest bucket for grouping
-            if dist < 1.0:
-                key_m = round(dist * 1609.344 / 50) * 50  # nearest 50m
-                label = f"{key_m:.0f}m"
-            else:
-                key_m = round(dist, 2)
-                label = f"{key_m:.2f}mi"
-            buckets[label].append(iv)
-
-        summary = []
-        for label, ivs in buckets.items():
-            if len(ivs) < 2:
-                continue
-            durations = [iv["duration_s"] for iv in ivs if iv.get("duration_s")]
-            paces = [iv["avg_pace_s_per_mi"] for iv in ivs if iv.get("avg_pace_s_per_mi")]
-            hrs = [iv["avg_hr"] for iv in ivs if iv.get("avg_hr")]
-            summary.append({
-                "distance": label,
-                "count": len(ivs),
-                "avg_duration": _format_duration_precise(sum(durations) / len(durations)) if durations else "",
-                "avg_pace": _format_pace(sum(paces) / len(paces)) if paces else "",
-                "avg_hr": f"{sum(hrs) / len(hrs):.0f}" if hrs else "",
-            })
-        return summary
-
     @app.route("/api/activity/<int:activity_id>/chart")
     def api_chart(activity_id):
         conn = get_db()
@@ -586,49 +799,53 @@ def create_app(config=None):
                ORDER BY source_id, timestamp_s""",
             (activity_id,),
         ).fetchall()
-        points = [dict(r) for r in rows]
         conn.close()
-        if not points:
-            return jsonify({"pace": [], "hr": []})
-
-        # 10-second rolling average for pace
-        pace_out = []
-        hr_out = []
-        window = 10  # seconds
-        for i, p in enumerate(points):
-            t = p["timestamp_s"] or 0
-            # Collect window
-            pace_vals = []
-            hr_vals = []
-            for j in range(max(0, i - window), min(len(points), i + window + 1)):
-                pj = points[j]
-                tj = pj["timestamp_s"] or 0
-                if abs(tj - t) <= window:
-                    if pj["pace_s_per_mi"] is not None and 200 < pj["pace_s_per_mi"] < 2000:
-                        pace_vals.append(pj["pace_s_per_mi"])
-                    if pj["heart_rate"] is not None and 50 < pj["heart_rate"] < 220:
-                        hr_vals.append(pj["heart_rate"])
-
-            if pace_vals:
-                pace_out.append({"t": t, "v": sum(pace_vals) / len(pace_vals)})
-            if hr_vals:
-                hr_out.append({"t": t, "v": sum(hr_vals) / len(hr_vals)})
-
-        # Downsample to ~600 points
-        def downsample(arr, target=600):
-            if len(arr) <= target:
-                return arr
-            step = len(arr) / target
-            out = []
-            i = 0.0
-            while int(i) < len(arr):
-                out.append(arr[int(i)])
-                i += step
-            return out
-
-        return jsonify({
-            "pace": downsample(pace_out),
-            "hr": downsample(hr_out),
+        if not rows:
+            return _json_response({"pace": {"t": [], "v": []}, "hr": {"t": [], "v": []}})
+
+        import numpy as np
+
+        # 10-second rolling average: each point averages the in-range values
+        # of its ±10 neighbours that are also within 10 s of it. Summed one
+        # neighbour offset at a time, in the same order as a per-point loop.
+        window = 10  # seconds (and neighbours each side)
+        # Columns by position; name lookups on sqlite3.Row cost a scan per
+        # access, which adds up over thousands of stream points
+        timestamps, paces, hrs = zip(*rows)
+        times = [ts or 0 for ts in timestamps]
+        t = np.array(times, dtype=np.float64)
+        pace = np.array(paces, dtype=np.float64)
+        hr = np.array(hrs, dtype=np.float64)
+        pace_ok = (pace > 200) & (pace < 2000)
+        hr_ok = (hr > 50) & (hr < 220)
+
+        n = len(rows)
+        pace_sum = np.zeros(n)
+        pace_count = np.zeros(n, dtype=np.int64)
+        hr_sum = np.zeros(n)
+        hr_count = np.zeros(n, dtype=np.int64)
+        for offset in range(-window, window + 1):
+            lo, hi = max(0, -offset), min(n, n - offset)
+            if lo >= hi:
+                continue
+            near = np.abs(t[lo + offset:hi + offset] - t[lo:hi]) <= window
+            use = near & pace_ok[lo + offset:hi + offset]
+            pace_sum[lo:hi] += np.where(use, pace[lo + offset:hi + offset], 0.0)
+            pace_count[lo:hi] += use
+            use = near & hr_ok[lo + offset:hi + offset]
+            hr_sum[lo:hi] += np.where(use, hr[lo + offset:hi + offset], 0.0)
+            hr_count[lo:hi] += use
+
+        # Whole seconds and whole bpm are finer than a chart pixel
+        pace_avg = np.rint(pace_sum / np.maximum(pace_count, 1)).astype(np.int64).tolist()
+        hr_avg = np.rint(hr_sum / np.maximum(hr_count, 1)).astype(np.int64).tolist()
+
+        # Downsample to ~600 points, sent as parallel t/v arrays
+        pace_idx = _downsample(np.flatnonzero(pace_count).tolist(), 600)
+        hr_idx = _downsample(np.flatnonzero(hr_count).tolist(), 600)
+        return _json_response({
+            "pace": {"t": [times[i] for i in pace_idx], "v": [pace_avg[i] for i in pace_idx]},
+            "hr": {"t": [times[i] for i in hr_idx], "v": [hr_avg[i] for i in hr_idx]},
         })
 
     @app.route("/api/activity/<int:activity_id>/streams")
@@ -640,17 +857,13 @@ def create_app(config=None):
                ORDER BY source_id, timestamp_s""",
             (activity_id,),
         ).fetchall()
-        points = [dict(r) for r in rows]
-        if len(points) > 500:
-            step = len(points) / 500
-            downsampled = []
-            i = 0.0
-            while int(i) < len(points):
-                downsampled.append(points[int(i)])
-                i += step
-            points = downsampled
         conn.close()
-        return jsonify(points)
+        # Columnar: two flat number arrays instead of one object per point
+        rows = _downsample(rows, 500)
+        return _json_response({
+            "lat": [r[0] for r in rows],
+            "lon": [r[1] for r in rows],
+        })
 
     @app.route("/api/activity/<int:activity_id>/meta")
     def api_activity_meta(activity_id):
@@ -705,8 +918,6 @@ def create_app(config=None):
         if field not in OVERRIDABLE_FIELDS:
             return jsonify({"error": f"field '{field}' is not overridable"}), 400
 
-        # Nullable numeric fields: empty string means NULL
-        NULLABLE_NUMERIC = {"avg_hr", "max_hr", "avg_cadence", "avg_pace_s_per_mi", "duration_s"}
         is_null = field in NULLABLE_NUMERIC and str(value).strip() == ""
 
         conn = get_db()
@@ -737,11 +948,6 @@ def create_app(config=None):
             )
             # Sync overrides to activities table so they become canonical
             # and won't be overridden by future imports
-            SYNC_FIELDS = {
-                "distance_mi", "duration_s", "avg_pace_s_per_mi",
-                "avg_hr", "max_hr", "avg_cadence",
-                "workout_name", "workout_category", "shoe_id", "strides", "notes",
-            }
             if field in SYNC_FIELDS:
                 if field == "distance_mi":
                     dist = float(value)
@@ -750,7 +956,7 @@ def create_app(config=None):
                         "updated_at = datetime('now') WHERE id = ?",
                         (dist, dist, activity_id),
                     )
-                elif field in ("duration_s", "avg_pace_s_per_mi", "avg_hr", "max_hr", "avg_cadence"):
+                elif field in FLOAT_SYNC_FIELDS:
                     conn.execute(
                         f"UPDATE activities SET {field} = ?, updated_at = datetime('now') WHERE id = ?",
                         (float(value), activity_id),
@@ -767,7 +973,7 @@ def create_app(config=None):
                                 "UPDATE activities SET avg_pace_display = ? WHERE id = ?",
                                 (_format_pace(pace), activity_id),
                             )
-                elif field in ("shoe_id", "strides"):
+                elif field in INT_SYNC_FIELDS:
                     conn.execute(
                         f"UPDATE activities SET {field} = ?, updated_at = datetime('now') WHERE id = ?",
                         (int(value), activity_id),
@@ -799,46 +1005,34 @@ def create_app(config=None):
             "UPDATE intervals SET is_walking = ? WHERE id = ?",
             (is_walking, interval_id),
         )
-        # Recalculate activity's adjusted_distance_mi
-        row = conn.execute(
-            "SELECT activity_id FROM intervals WHERE id = ?", (interval_id,)
-        ).fetchone()
-        if row:
-            aid = row["activity_id"]
-            # Sum non-walking interval distances, avoiding double-count
-            # when both NULL-source (FIT) and strava_lap exist
-            has_both = conn.execute(
-                """SELECT COUNT(DISTINCT CASE WHEN source IS NULL THEN 1 END) as has_null,
-                          COUNT(DISTINCT CASE WHEN source = 'strava_lap' THEN 1 END) as has_strava
-                   FROM intervals WHERE activity_id = ?
-                     AND (source IS NULL OR source = 'strava_lap')""",
-                (aid,),
-            ).fetchone()
-            if has_both["has_null"] and has_both["has_strava"]:
-                source_filter = "AND source = 'strava_lap'"
-            else:
-                source_filter = "AND (source IS NULL OR source != 'pace_segment')"
-            total = conn.execute(
-                f"""SELECT COALESCE(SUM(
-                       COALESCE(canonical_distance_mi, gps_measured_distance_mi, prescribed_distance_mi, 0)
-                   ), 0) as total
-                   FROM intervals
-                   WHERE activity_id = ? AND NOT is_walking
-                     {source_filter}""",
-                (aid,),
-            ).fetchone()["total"]
-            conn.execute(
-                "UPDATE activities SET adjusted_distance_mi = ? WHERE id = ?",
-                (total if total > 0 else None, aid),
-            )
+        # Recalculate the activity's adjusted_distance_mi in the same
+        # statement: sum non-walking interval distances, counting only
+        # strava_lap rows when both NULL-source (FIT) and strava_lap exist
+        conn.execute(
+            """UPDATE activities SET adjusted_distance_mi = (
+                   SELECT CASE WHEN SUM(d) > 0 THEN SUM(d) END FROM (
+                       SELECT COALESCE(i.canonical_distance_mi, i.gps_measured_distance_mi,
+                                       i.prescribed_distance_mi, 0) AS d
+                       FROM intervals i
+                       WHERE i.activity_id = activities.id AND NOT i.is_walking
+                         AND CASE WHEN EXISTS (SELECT 1 FROM intervals
+                                               WHERE activity_id = i.activity_id AND source IS NULL)
+                                   AND EXISTS (SELECT 1 FROM intervals
+                                               WHERE activity_id = i.activity_id AND source = 'strava_lap')
+                                  THEN i.source = 'strava_lap'
+                                  ELSE i.source IS NULL OR i.source != 'pace_segment'
+                             END
+                   )
+               )
+               WHERE id = (SELECT activity_id FROM intervals WHERE id = ?)""",
+            (interval_id,),
+        )
         conn.commit()
         conn.close()
         return jsonify({"ok": True, "interval_id": interval_id, "is_walking": is_walking})
 
     # ── Interval editing ──────────────────────────────────────────
 
-    INTERVAL_EDITABLE = {"distance", "duration_s", "avg_hr", "pace_zone"}
-
     @app.route("/api/interval/<int:interval_id>/edit", methods=["PUT"])
     def api_edit_interval(interval_id):
         data = request.get_json()
@@ -851,60 +1045,46 @@ def create_app(config=None):
             return jsonify({"error": f"field '{field}' is not editable"}), 400
 
         conn = get_db()
-        row = conn.execute(
-            "SELECT * FROM intervals WHERE id = ?", (interval_id,)
+        iv = conn.execute(
+            """SELECT duration_s, canonical_distance_mi, gps_measured_distance_mi,
+                      prescribed_distance_mi
+               FROM intervals WHERE id = ?""",
+            (interval_id,),
         ).fetchone()
-        if not row:
+        if not iv:
             conn.close()
             return jsonify({"error": "interval not found"}), 404
 
-        iv = dict(row)
-
         if field == "distance":
             # Value is in miles
             dist = float(value)
-            conn.execute(
-                "UPDATE intervals SET canonical_distance_mi = ?, source = 'manual' WHERE id = ?",
-                (dist, interval_id),
-            )
+            updates = {"canonical_distance_mi": dist}
             # Recalculate pace if duration exists
-            dur = iv.get("duration_s")
+            dur = iv["duration_s"]
             if dur and dist > 0:
                 pace = dur / dist
-                conn.execute(
-                    "UPDATE intervals SET avg_pace_s_per_mi = ?, avg_pace_display = ? WHERE id = ?",
-                    (pace, _format_pace(pace), interval_id),
-                )
+                updates.update(avg_pace_s_per_mi=pace, avg_pace_display=_format_pace(pace))
 
         elif field == "duration_s":
             dur = float(value)
-            conn.execute(
-                "UPDATE intervals SET duration_s = ?, source = 'manual' WHERE id = ?",
-                (dur, interval_id),
-            )
+            updates = {"duration_s": dur}
             # Recalculate pace if distance exists
-            dist = iv.get("canonical_distance_mi") or iv.get("gps_measured_distance_mi") or iv.get("prescribed_distance_mi")
+            dist = iv["canonical_distance_mi"] or iv["gps_measured_distance_mi"] or iv["prescribed_distance_mi"]
             if dist and dist > 0:
                 pace = dur / dist
-                conn.execute(
-                    "UPDATE intervals SET avg_pace_s_per_mi = ?, avg_pace_display = ? WHERE id = ?",
-                    (pace, _format_pace(pace), interval_id),
-                )
+                updates.update(avg_pace_s_per_mi=pace, avg_pace_display=_format_pace(pace))
 
         elif field == "avg_hr":
-            hr = float(value) if value else None
-            conn.execute(
-                "UPDATE intervals SET avg_hr = ?, source = 'manual' WHERE id = ?",
-                (hr, interval_id),
-            )
+            updates = {"avg_hr": float(value) if value else None}
 
         elif field == "pace_zone":
-            zone = value if value else None
-            conn.execute(
-                "UPDATE intervals SET pace_zone = ?, source = 'manual' WHERE id = ?",
-                (zone, interval_id),
-            )
+            updates = {"pace_zone": value if value else None}
 
+        assignments = ", ".join(f"{col} = ?" for col in updates)
+        conn.execute(
+            f"UPDATE intervals SET {assignments}, source = 'manual' WHERE id = ?",
+            (*updates.values(), interval_id),
+        )
         conn.commit()
 
         # Fetch updated interval for response
@@ -959,71 +1139,79 @@ def create_app(config=None):
         if not start or not end:
             return jsonify({"error": "start and end required"}), 400
 
-        # Fetch 7 days before start for trailing window
-        window_start = (date.fromisoformat(start) - timedelta(days=7)).isoformat()
+        start_d = date.fromisoformat(start)
+        end_d = date.fromisoformat(end)
+
+        key = (start_d, end_d)
+        version = _data_version()
+        cached = _cached_stats(_seven_day_cache, key, version)
+        if cached is None:
+            # A cached wider range already holds every day of this one
+            for (cs, ce), entry in _seven_day_cache.items():
+                if entry[0] == version and cs <= start_d and end_d <= ce:
+                    entry[2] += 1
+                    lo, hi = start_d.isoformat(), end_d.isoformat()
+                    cached = {d: v for d, v in entry[1].items() if lo <= d <= hi}
+                    break
+        if cached is not None:
+            return jsonify(cached)
+
         conn = get_db()
 
-        # Real activity distances
+        # Dense per-day series from 6 days before start, generated in SQL and
+        # joined to the daily_distance rollup; planned distances only count
+        # on dates without real activities
         rows = conn.execute(
-            """SELECT date, COALESCE(adjusted_distance_mi, distance_mi, 0) as dist
-               FROM activities WHERE date BETWEEN ? AND ?""",
-            (window_start, end),
-        ).fetchall()
-        daily = {}
-        for r in rows:
-            daily[r["date"]] = daily.get(r["date"], 0) + r["dist"]
-
-        # Planned distances (only for dates without real activities)
-        planned = conn.execute(
-            "SELECT date, distance_mi FROM planned_activities WHERE date BETWEEN ? AND ?",
-            (window_start, end),
+            """WITH RECURSIVE days(d) AS (
+                   SELECT date(?, '-6 days')
+                   UNION ALL
+                   SELECT date(d, '+1 day') FROM days WHERE d < ?
+               )
+               SELECT days.d AS date,
+                      COALESCE(CASE WHEN dd.activity_count > 0 THEN dd.real_mi
+                                    ELSE dd.planned_mi END, 0) AS dist
+               FROM days LEFT JOIN daily_distance dd ON dd.date = days.d
+               ORDER BY days.d""",
+            (start_d.isoformat(), end_d.isoformat()),
         ).fetchall()
-        act_dates = set(daily.keys())
-        for r in planned:
-            if r["date"] not in act_dates and r["distance_mi"]:
-                daily[r["date"]] = daily.get(r["date"], 0) + r["distance_mi"]
         conn.close()
 
-        # Compute 7d MA for each day in requested range
+        # Each day's window is a slice, summed same-day first as before
+        dists = [r[1] for r in rows]
         result = {}
-        d = date.fromisoformat(start)
-        end_d = date.fromisoformat(end)
-        while d <= end_d:
+        for i in range(6, len(rows)):
             total = 0.0
-            for offset in range(7):
-                dd = (d - timedelta(days=offset)).isoformat()
-                total += daily.get(dd, 0)
-            result[d.isoformat()] = round(total, 1)
-            d += timedelta(days=1)
+            for dist in reversed(dists[i - 6:i + 1]):
+                total += dist
+            result[rows[i][0]] = round(total, 1)
 
+        _store_stats(_seven_day_cache, key, version, result)
         return jsonify(result)
 
     @app.route("/api/footer_stats")
     def api_footer_stats():
         """Return yearly + monthly stats for live footer updates."""
         year = request.args.get("year", type=int, default=date.today().year)
-        conn = get_db()
         today_d = date.today()
 
-        rows = conn.execute(
-            """SELECT date,
-                      COALESCE(adjusted_distance_mi, distance_mi, 0) as dist,
-                      COALESCE(duration_s, 0) as dur
-               FROM activities
-               WHERE date BETWEEN ? AND ?""",
-            (f"{year}-01-01", f"{year}-12-31"),
-        ).fetchall()
-        conn.close()
+        # Elapsed-week averages depend on today, so it is part of the version
+        version = (today_d, _data_version())
+        cached = _cached_stats(_footer_cache, year, version)
+        if cached is not None:
+            return jsonify(cached)
 
-        # Monthly buckets
+        conn = get_db()
+
+        # Monthly buckets, read from the trigger-maintained monthly_stats rollup
         monthly = {m: {"distance": 0.0, "duration": 0.0, "count": 0, "longest": 0.0} for m in range(1, 13)}
-        for r in rows:
-            m = int(r["date"][5:7])
-            monthly[m]["distance"] += r["dist"]
-            monthly[m]["duration"] += r["dur"]
-            monthly[m]["count"] += 1
-            if r["dist"] > monthly[m]["longest"]:
-                monthly[m]["longest"] = r["dist"]
+        for month, distance, duration, count, longest in conn.execute(
+            "SELECT month, distance, duration, count, longest FROM monthly_stats WHERE year = ?",
+            (year,),
+        ):
+            if month in monthly:
+                monthly[month] = {"distance": distance, "duration": duration,
+                                  "count": count, "longest": longest}
+        conn.close()
 
         yearly_distance = sum(monthly[m]["distance"] for m in range(1, 13))
         yearly_duration = sum(monthly[m]["duration"] for m in range(1, 13))
@@ -1031,16 +1219,11 @@ def create_app(config=None):
         longest_run = max(monthly[m]["longest"] for m in range(1, 13))
         yearly_avg_pace = (yearly_duration / yearly_distance) if yearly_distance > 0 else None
 
+        elapsed_by_month = _elapsed_days(year, today_d)
         stats = []
         for m in range(1, 13):
             s = monthly[m]
-            days_in_m = monthrange(year, m)[1]
-            if year == today_d.year and m == today_d.month:
-                elapsed_days = today_d.day
-            elif year < today_d.year or (year == today_d.year and m < today_d.month):
-                elapsed_days = days_in_m
-            else:
-                elapsed_days = 0
+            elapsed_days = elapsed_by_month[m]
             elapsed_weeks = elapsed_days / 7.0 if elapsed_days > 0 else 0
             avg_weekly = (s["distance"] / elapsed_weeks) if elapsed_weeks > 0 else 0
             avg_pace = (s["duration"] / s["distance"]) if s["distance"] > 0 else None
@@ -1058,7 +1241,7 @@ def create_app(config=None):
 
         max_month_dist = max((s["distance"] for s in stats), default=1) or 1
 
-        return jsonify({
+        payload = {
             "monthly": stats,
             "max_month_dist": max_month_dist,
             "yearly_distance": round(yearly_distance, 1),
@@ -1066,32 +1249,52 @@ def create_app(config=None):
             "yearly_duration": _format_duration(yearly_duration),
             "yearly_avg_pace": _format_pace(yearly_avg_pace),
             "longest_run": round(longest_run, 1),
-        })
+        }
+        _store_stats(_footer_cache, year, version, payload)
+        return jsonify(payload)
 
     # ── Import pipeline ─────────────────────────────────────────────
 
     _import_lock = threading.Lock()
-    _import_status = {"running": False, "output": "", "success": None}
+    _import_status = {"running": False, "output": deque(maxlen=IMPORT_OUTPUT_LINES), "success": None}
 
     @app.route("/api/import", methods=["POST"])
     def api_import():
         if _import_status["running"]:
             return jsonify({"ok": False, "error": "Import already running"})
         _import_status["running"] = True
-        _import_status["output"] = ""
+        _import_status["output"] = output = deque(maxlen=IMPORT_OUTPUT_LINES)
         _import_status["success"] = None
 
+        def read_output(stream):
+            for line in stream:
+                with _import_lock:
+                    output.append(line.rstrip("\n"))
+
         def run_pipeline():
             try:
                 import sys
-                result = subprocess.run(
-                    [sys.executable, "-m", "runbase", "pipeline", "-v"],
-                    capture_output=True, text=True, timeout=300,
+                # Unbuffered and merged, so status polls see lines as they
+                # are printed rather than all at exit
+                proc = subprocess.Popen(
+                    [sys.executable, "-u", "-m", "runbase", "pipeline", "-v"],
+                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                    text=True, bufsize=1,
                 )
-                _import_status["output"] = result.stdout + result.stderr
-                _import_status["success"] = result.returncode == 0
+                reader = threading.Thread(target=read_output, args=(proc.stdout,), daemon=True)
+                reader.start()
+                try:
+                    returncode = proc.wait(timeout=IMPORT_TIMEOUT_S)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+                    raise
+                finally:
+                    reader.join()
+                _import_status["success"] = returncode == 0
             except Exception as e:
-                _import_status["output"] = str(e)
+                with _import_lock:
+                    output.append(str(e))
                 _import_status["success"] = False
             finally:
                 _import_status["running"] = False
@@ -1101,10 +1304,12 @@ def create_app(config=None):
 
     @app.route("/api/import/status")
     def api_import_status():
+        with _import_lock:
+            output = "\n".join(_import_status["output"])
         return jsonify({
             "running": _import_status["running"],
             "success": _import_status["success"],
-            "output": _import_status["output"],
+            "output": output,
         })
 
     @app.route("/api/activity/<int:activity_id>/override/<field>", methods=["DELETE"])
@@ -320,8 +320,9 @@
         Promise.all(activityIds.map(aid =>
             fetch(`/api/activity/${aid}/chart`).then(r => r.json())
         )).then(results => {
-            const allPace = results.flatMap(r => r.pace || []);
-            const allHr = results.flatMap(r => r.hr || []);
+            const points = s => s ? s.t.map((t, i) => ({ t, v: s.v[i] })) : [];
+            const allPace = results.flatMap(r => points(r.pace));
+            const allHr = results.flatMap(r => points(r.hr));
             if (allPace.length || allHr.length) {
                 renderCharts(id, allPace, allHr);
             }
@@ -332,7 +333,7 @@
             Promise.all(activityIds.map(aid =>
                 fetch(`/api/activity/${aid}/streams`).then(r => r.json())
             )).then(results => {
-                renderMap(id, results.flat());
+                renderMap(id, results.flatMap(r => r.lat.map((lat, i) => [lat, r.lon[i]])));
             });
         }
     }
@@ -1009,9 +1010,9 @@
 
     // ── Render map ──────────────────────────────────────────────
 
-    function renderMap(id, points) {
+    function renderMap(id, latlngs) {
         const container = document.getElementById(`map-${id}`);
-        if (!container || !points.length) return;
+        if (!container || !latlngs.length) return;
 
         setTimeout(() => {
             if (maps[id]) { maps[id].invalidateSize(); return; }
@@ -1021,7 +1022,6 @@
                 maxZoom: 19,
             }).addTo(map);
 
-            const latlngs = points.map(p => [p.lat, p.lon]);
             const polyline = L.polyline(latlngs, {
                 color: "#4A90D9", weight: 3, opacity: 0.8,
             }).addTo(map);
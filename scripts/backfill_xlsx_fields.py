@@ -7,6 +7,7 @@ Usage:
 """
 
 import argparse
+import re
 import sys
 from pathlib import Path
 
@@ -16,13 +17,18 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from runbase.config import load_config
 from runbase.db import get_connection
 from runbase.ingest.xlsx_import import (
+    _apply_import_pragmas,
     _read_xlsx,
     _classify_row,
+    _clean,
     _normalize_date,
     _parse_strides,
     _parse_workout_category,
 )
 
+# Distance in a text cardio cell, e.g. "3 miles in 26:30"
+MILES_RE = re.compile(r"(\d+\.?\d*)\s*miles?", re.IGNORECASE)
+
 
 def main():
     parser = argparse.ArgumentParser(description="Backfill strides + workout_category from XLSX")
@@ -32,6 +38,8 @@ def main():
     config = load_config()
     conn = get_connection(config)
     conn.execute("PRAGMA busy_timeout = 30000")  # wait up to 30s for locks
+    # Same relaxed durability as the XLSX import (WAL is set by get_connection)
+    _apply_import_pragmas(conn, config)
 
     # Step 1: ALTER TABLE to add new columns (idempotent)
     existing_cols = {row[1] for row in conn.execute("PRAGMA table_info(activities)").fetchall()}
@@ -58,7 +66,19 @@ def main():
     if args.verbose:
         print(f"Read {len(raw_rows)} data rows from XLSX")
 
-    # Step 3: Parse and match to existing activities
+    # Step 3: Parse and match to existing activities.
+    # XLSX-sourced activities are loaded once, grouped by date, and matched in
+    # memory; the updates are applied in one batch at the end.
+    candidates = {}
+    for activity_id, date_str, distance_mi, workout_name in conn.execute(
+        """SELECT a.id, a.date, a.distance_mi, a.workout_name FROM activities a
+           JOIN activity_sources s ON s.activity_id = a.id
+           WHERE s.source = 'master_xlsx'"""
+    ):
+        candidates.setdefault(date_str, []).append([activity_id, distance_mi, workout_name])
+
+    conn.execute("BEGIN IMMEDIATE")
+    updates = []
     updated = 0
     matched = 0
     unmatched = 0
@@ -81,21 +101,13 @@ def main():
             except (ValueError, TypeError):
                 pass
         elif row_type == "text":
-            import re
-            m = re.search(r'(\d+\.?\d*)\s*miles?', str(cardio), re.IGNORECASE)
+            m = MILES_RE.search(str(cardio))
             if m:
                 distance_mi = round(float(m.group(1)), 2)
 
         # Parse new fields
-        cardio_note = raw.get("cardio_note")
-        cn_str = str(cardio_note).strip() if cardio_note else None
-        if cn_str == "" or cn_str == "None":
-            cn_str = None
-
-        workout_title = raw.get("workout_title")
-        wt_str = str(workout_title).strip() if workout_title else None
-        if wt_str == "" or wt_str == "None":
-            wt_str = None
+        cn_str = _clean(raw.get("cardio_note"))
+        wt_str = _clean(raw.get("workout_title"))
 
         strides = _parse_strides(cn_str, wt_str)
         workout_category = _parse_workout_category(cn_str, wt_str)
@@ -107,21 +119,16 @@ def main():
 
         # Match to DB activity by date + distance via activity_sources
         if distance_mi is not None:
-            row_match = conn.execute(
-                """SELECT a.id, a.workout_name FROM activities a
-                   JOIN activity_sources s ON s.activity_id = a.id
-                   WHERE a.date = ? AND s.source = 'master_xlsx'
-                         AND ABS(a.distance_mi - ?) < 0.01""",
-                (date_str, distance_mi),
-            ).fetchone()
+            row_match = next(
+                (c for c in candidates.get(date_str, ())
+                 if c[1] is not None and abs(c[1] - distance_mi) < 0.01),
+                None,
+            )
         else:
-            row_match = conn.execute(
-                """SELECT a.id, a.workout_name FROM activities a
-                   JOIN activity_sources s ON s.activity_id = a.id
-                   WHERE a.date = ? AND s.source = 'master_xlsx'
-                         AND a.distance_mi IS NULL""",
-                (date_str,),
-            ).fetchone()
+            row_match = next(
+                (c for c in candidates.get(date_str, ()) if c[1] is None),
+                None,
+            )
 
         if row_match is None:
             unmatched += 1
@@ -131,7 +138,7 @@ def main():
 
         matched += 1
         activity_id = row_match[0]
-        current_workout_name = row_match[1]
+        current_workout_name = row_match[2]
 
         # Determine if workout_name needs fixing:
         # If current name came from col 9 (cardio_note) and col 10 was empty,
@@ -141,13 +148,12 @@ def main():
         if current_workout_name and wt_str is None and current_workout_name == cn_str:
             fixed_name = None  # Was a col 9 fallback — clear it
 
-        conn.execute(
-            """UPDATE activities
-               SET strides = ?, workout_category = ?, workout_name = ?,
-                   updated_at = datetime('now')
-               WHERE id = ?""",
-            (strides, workout_category, fixed_name, activity_id),
-        )
+        updates.append((strides, workout_category, fixed_name, activity_id))
+        # Later rows matching the same activity see the new name, as they
+        # would have reading it back from the table
+        for c in candidates[date_str]:
+            if c[0] == activity_id:
+                c[2] = fixed_name
         updated += 1
 
         if args.verbose and (strides or workout_category != "easy" or fixed_name != current_workout_name):
@@ -155,6 +161,14 @@ def main():
                   f"cat={workout_category}  strides={strides}  "
                   f"name={fixed_name!r}")
 
+    conn.executemany(
+        """UPDATE activities
+           SET strides = ?, workout_category = ?, workout_name = ?,
+               updated_at = datetime('now')
+           WHERE id = ?""",
+        updates,
+    )
+
     # Step 4: Default workout_category='easy' for any remaining NULL rows
     # (could be from FIT/Strava imports that don't have category info)
     remaining = conn.execute(
@@ -13,7 +13,6 @@ Usage:
 import json
 import os
 import sys
-import threading
 import webbrowser
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
@@ -13,7 +13,7 @@ Usage:
 """
 
 import argparse
-import json
+import sqlite3
 import sys
 from pathlib import Path
 
@@ -23,73 +23,95 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from runbase.config import load_config
 from runbase.db import get_connection
 from runbase.ingest.fit_parser import format_pace
-from runbase.reconcile.enricher import _lookup_shoe_id, _infer_category, _map_workout_type
+from runbase.reconcile.enricher import _infer_category, _map_workout_type
+
+# Splits are committed in batches of this many activities: one transaction
+# per batch instead of per activity, while an interrupted run keeps its
+# completed batches (split targets are re-found on the next run)
+SPLIT_COMMIT_EVERY = 500
+# Likewise for re-enriching the new activities
+ENRICH_COMMIT_EVERY = 200
+
+# Connection settings for the migration. get_connection() already enables
+# WAL, under which synchronous=NORMAL only fsyncs at checkpoints; the
+# migration is re-runnable if interrupted.
+MIGRATION_PRAGMAS = {
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -200000,  # KiB, i.e. 200 MB page cache
+    "mmap_size": 268435456,  # 256 MB; no-op where SQLite lacks mmap support
+}
+
+# Indexes matching the split's per-activity lookups and reassignments,
+# created for the split pass and dropped after it. IF NOT EXISTS, so a
+# crashed run's leftovers are simply reused next time.
+SPLIT_INDEXES = {
+    "idx_split_activity_sources": "activity_sources(activity_id, source)",
+    "idx_split_streams": "streams(activity_id, source_id)",
+    "idx_split_detected_tracks": "detected_tracks(detected_by_activity_id)",
+}
 
 
 def find_group_matched_activities(conn, verbose=False):
-    """Find activities with >1 Strava source in activity_sources."""
-    rows = conn.execute("""
-        SELECT a.id, a.date, a.distance_mi, a.workout_name,
-               COUNT(s.id) as source_count
+    """Find activities with >1 Strava source in activity_sources.
+
+    Each target carries its Strava sources, sorted by start_time, loaded in
+    the same query as sqlite3.Row objects keyed by column name. The few
+    metadata fields the split uses are extracted by SQLite rather than
+    parsing each metadata_json blob in Python.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    rows = cursor.execute("""
+        SELECT a.id AS activity_id, a.date AS activity_date,
+               a.distance_mi AS activity_distance_mi,
+               a.workout_name AS activity_workout_name,
+               s.id, s.source_id, s.distance_mi, s.duration_s,
+               s.avg_hr, s.max_hr, s.avg_cadence,
+               s.total_ascent_ft, s.calories, s.workout_name,
+               json_extract(s.metadata_json, '$.start_date') AS start_date,
+               json_extract(s.metadata_json, '$.start_time') AS start_time,
+               json_extract(s.metadata_json, '$.strava_name') AS strava_name,
+               json_extract(s.metadata_json, '$.gear_id') AS gear_id,
+               json_extract(s.metadata_json, '$.workout_type') AS workout_type
         FROM activities a
         JOIN activity_sources s ON s.activity_id = a.id AND s.source = 'strava'
-        GROUP BY a.id
-        HAVING COUNT(s.id) > 1
-        ORDER BY a.date
+        WHERE a.id IN (
+            SELECT activity_id FROM activity_sources
+            WHERE source = 'strava'
+            GROUP BY activity_id
+            HAVING COUNT(*) > 1
+        )
+        ORDER BY a.date, a.id, start_time, s.id
     """).fetchall()
 
     targets = []
     for r in rows:
-        targets.append({
-            "activity_id": r[0],
-            "date": r[1],
-            "distance_mi": r[2],
-            "workout_name": r[3],
-            "source_count": r[4],
-        })
+        if not targets or targets[-1]["activity_id"] != r["activity_id"]:
+            targets.append({
+                "activity_id": r["activity_id"],
+                "date": r["activity_date"],
+                "distance_mi": r["activity_distance_mi"],
+                "workout_name": r["activity_workout_name"],
+                "sources": [],
+            })
+        targets[-1]["sources"].append(r)
+    for t in targets:
+        t["source_count"] = len(t["sources"])
 
     if verbose:
         print(f"Found {len(targets)} group-matched activities to split.")
     return targets
 
 
-def load_sources_for_activity(conn, activity_id):
-    """Load all Strava activity_sources for an activity, sorted by start_time."""
-    rows = conn.execute("""
-        SELECT id, source_id, distance_mi, duration_s,
-               avg_pace_s_per_mi, avg_hr, max_hr, avg_cadence,
-               total_ascent_ft, calories, workout_name, metadata_json
-        FROM activity_sources
-        WHERE activity_id = ? AND source = 'strava'
-        ORDER BY json_extract(metadata_json, '$.start_time')
-    """, (activity_id,)).fetchall()
+def load_shoe_ids_by_gear(conn):
+    """Map Strava gear_id -> shoe_id; the lowest shoe id wins on duplicates."""
+    return dict(conn.execute(
+        "SELECT strava_gear_id, id FROM shoes WHERE strava_gear_id != '' ORDER BY id DESC"
+    ))
 
-    sources = []
-    for r in rows:
-        meta = json.loads(r[11]) if r[11] else {}
-        sources.append({
-            "id": r[0],
-            "source_id": r[1],
-            "distance_mi": r[2],
-            "duration_s": r[3],
-            "avg_pace_s_per_mi": r[4],
-            "avg_hr": r[5],
-            "max_hr": r[6],
-            "avg_cadence": r[7],
-            "total_ascent_ft": r[8],
-            "calories": r[9],
-            "workout_name": r[10],
-            "metadata": meta,
-            "start_date": meta.get("start_date"),
-            "start_time": meta.get("start_time"),
-            "strava_name": meta.get("strava_name"),
-            "gear_id": meta.get("gear_id"),
-            "workout_type": meta.get("workout_type"),
-        })
-    return sources
-
-
-def split_activity(conn, activity_id, sources, verbose=False):
+
+def split_activity(conn, activity_id, sources, shoe_by_gear, verbose=False):
     """Split one group-matched activity into individual activities.
 
     Returns list of (strava_id, new_activity_id, source_id) tuples for fetch.
@@ -105,15 +127,16 @@ def split_activity(conn, activity_id, sources, verbose=False):
 
         workout_name = src["strava_name"] or src["workout_name"]
         workout_type = _map_workout_type(src["workout_type"])
-        # Build a source-like dict for _infer_category
+        # Build a source-like dict for _infer_category, which only reads
+        # workout_type from metadata
         cat_source = {
-            "metadata": src["metadata"],
+            "metadata": {"workout_type": src["workout_type"]},
             "strava_name": src["strava_name"],
             "workout_name": src["workout_name"],
         }
         workout_category = _infer_category(cat_source)
-        shoe_id = _lookup_shoe_id(conn, src["gear_id"])
-        date = src["start_date"] or src["metadata"].get("start_date")
+        shoe_id = shoe_by_gear.get(src["gear_id"])
+        date = src["start_date"]
         start_time = src["start_time"]
 
         # Insert new activity
@@ -131,25 +154,23 @@ def split_activity(conn, activity_id, sources, verbose=False):
              workout_name, workout_type, workout_category, shoe_id),
         )
         new_id = cursor.lastrowid
-
-        # Point the activity_source at the new activity
-        conn.execute(
-            "UPDATE activity_sources SET activity_id = ? WHERE id = ?",
-            (new_id, src["id"]),
-        )
-
-        # Reassign streams by source_id
-        conn.execute(
-            "UPDATE streams SET activity_id = ? WHERE activity_id = ? AND source_id = ?",
-            (new_id, activity_id, src["id"]),
-        )
-
         pairs.append((src["source_id"], new_id, src["id"]))
 
         if verbose:
             print(f"    → activity #{new_id}: {dist:.2f}mi "
                   f"\"{workout_name or '?'}\" (source #{src['id']})")
 
+    # Point each activity_source at its new activity, and reassign its
+    # streams by source_id
+    conn.executemany(
+        "UPDATE activity_sources SET activity_id = ? WHERE id = ?",
+        [(new_id, src_id) for _, new_id, src_id in pairs],
+    )
+    conn.executemany(
+        "UPDATE streams SET activity_id = ? WHERE activity_id = ? AND source_id = ?",
+        [(new_id, activity_id, src_id) for _, new_id, src_id in pairs],
+    )
+
     # Unlink non-Strava sources (e.g. master_xlsx) — orphan them rather than
     # leaving them pointing at an activity_id that's about to be deleted
     conn.execute(
@@ -161,12 +182,16 @@ def split_activity(conn, activity_id, sources, verbose=False):
     # Reassign detected_tracks to the new activity with the most streams
     # (the sub-activity whose GPS data was used for track detection)
     if pairs:
+        new_ids = [new_id for _, new_id, _ in pairs]
+        counts = dict(conn.execute(
+            "SELECT activity_id, COUNT(*) FROM streams "
+            f"WHERE activity_id IN ({', '.join('?' * len(new_ids))}) GROUP BY activity_id",
+            new_ids,
+        ))
         best_new_id = pairs[0][1]  # default to first
         best_count = 0
-        for _, new_id, _ in pairs:
-            cnt = conn.execute(
-                "SELECT COUNT(*) FROM streams WHERE activity_id = ?", (new_id,)
-            ).fetchone()[0]
+        for new_id in new_ids:
+            cnt = counts.get(new_id, 0)
             if cnt > best_count:
                 best_count = cnt
                 best_new_id = new_id
@@ -190,6 +215,12 @@ def split_activity(conn, activity_id, sources, verbose=False):
     return pairs
 
 
+def _drop_split_indexes(conn):
+    """Drop the SPLIT_INDEXES once the split pass no longer needs them."""
+    for name in SPLIT_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Split group-matched activities into separate rows")
@@ -203,10 +234,17 @@ def main():
     config = load_config()
     conn = get_connection(config)
     conn.execute("PRAGMA busy_timeout = 30000")
+    if not args.dry_run:
+        for name, value in MIGRATION_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        for name, columns in SPLIT_INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
 
     targets = find_group_matched_activities(conn, verbose=args.verbose)
     if not targets:
         print("No group-matched activities found.")
+        if not args.dry_run:
+            _drop_split_indexes(conn)
         conn.close()
         return
 
@@ -215,13 +253,19 @@ def main():
     split_count = 0
     new_count = 0
 
+    shoe_by_gear = load_shoe_ids_by_gear(conn)
+
+    # Splitting one target never touches another's Strava sources, so the
+    # sources loaded with the targets stay current through the loop
     for t in targets:
+        if not args.dry_run and not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
         activity_id = t["activity_id"]
-        sources = load_sources_for_activity(conn, activity_id)
+        sources = t["sources"]
 
         if args.verbose or args.dry_run:
             dists = [f"{s['distance_mi']:.2f}" for s in sources]
-            names = [s.get("strava_name") or s.get("workout_name") or "?" for s in sources]
+            names = [s["strava_name"] or s["workout_name"] or "?" for s in sources]
             print(f"{'[DRY RUN] ' if args.dry_run else ''}"
                   f"SPLIT activity #{activity_id} ({t['date']}, {t['distance_mi']:.2f}mi) "
                   f"→ {len(sources)} activities: {' + '.join(dists)}mi "
@@ -232,13 +276,17 @@ def main():
             new_count += len(sources)
             continue
 
-        pairs = split_activity(conn, activity_id, sources, verbose=args.verbose)
-        conn.commit()
+        pairs = split_activity(conn, activity_id, sources, shoe_by_gear, verbose=args.verbose)
 
         all_pairs.extend(pairs)
         new_activity_ids.extend(p[1] for p in pairs)
         split_count += 1
         new_count += len(pairs)
+        if split_count % SPLIT_COMMIT_EVERY == 0:
+            conn.commit()
+    conn.commit()
+    if not args.dry_run:
+        _drop_split_indexes(conn)
 
     print(f"\n{'[DRY RUN] ' if args.dry_run else ''}"
           f"Split {split_count} activities → {new_count} new activities")
@@ -265,14 +313,17 @@ def main():
 
         print(f"\nEnriching {len(new_activity_ids)} new activities...")
         enriched = 0
-        for aid in new_activity_ids:
+        for i, aid in enumerate(new_activity_ids, 1):
             try:
-                result = enrich_activity(conn, aid, config, verbose=args.verbose)
+                result = enrich_activity(conn, aid, config, verbose=args.verbose, commit=False)
                 if not result["skipped"]:
                     enriched += 1
             except Exception as e:
                 if args.verbose:
                     print(f"  ERROR enriching activity #{aid}: {e}")
+            if i % ENRICH_COMMIT_EVERY == 0:
+                conn.commit()
+        conn.commit()
         print(f"  Enriched: {enriched}")
 
     conn.close()